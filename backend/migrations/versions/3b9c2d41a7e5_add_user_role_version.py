@@ -0,0 +1,31 @@
+"""add user role_version
+
+Revision ID: 3b9c2d41a7e5
+Revises: ef0389f8f80f
+Create Date: 2026-10-18 09:12:40.118233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c2d41a7e5'
+down_revision: Union[str, Sequence[str], None] = 'ef0389f8f80f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'user',
+        sa.Column('role_version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user', 'role_version')
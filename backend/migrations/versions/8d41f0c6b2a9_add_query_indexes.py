@@ -0,0 +1,66 @@
+"""add indexes for activity, booking and role queries
+
+Revision ID: 8d41f0c6b2a9
+Revises: 3b9c2d41a7e5
+Create Date: 2026-10-18 10:02:11.547310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f0c6b2a9'
+down_revision: Union[str, Sequence[str], None] = '3b9c2d41a7e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY avoids blocking writes on large tables, but cannot run
+    # inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_activity_start_time_id', 'activity', ['start_time', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_activity_coach_id_start_time', 'activity', ['coach_id', 'start_time'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_activity_booking_activity_id_status', 'activity_booking',
+            ['activity_id', 'booking_status'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_activity_booking_confirmed_activity_id', 'activity_booking',
+            ['activity_id'],
+            postgresql_where=sa.text("booking_status = 'CONFIRMED'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_activity_booking_user_id', 'activity_booking', ['user_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_user_role_role_id_user_id', 'user_role', ['role_id', 'user_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_role_role_id_user_id', table_name='user_role')
+    op.drop_index('ix_activity_booking_user_id', table_name='activity_booking')
+    op.drop_index(
+        'ix_activity_booking_confirmed_activity_id', table_name='activity_booking'
+    )
+    op.drop_index(
+        'ix_activity_booking_activity_id_status', table_name='activity_booking'
+    )
+    op.drop_index('ix_activity_coach_id_start_time', table_name='activity')
+    op.drop_index('ix_activity_start_time_id', table_name='activity')
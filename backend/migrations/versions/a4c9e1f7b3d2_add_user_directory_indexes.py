@@ -0,0 +1,43 @@
+"""add user directory keyset indexes
+
+Revision ID: a4c9e1f7b3d2
+Revises: f3b7d2e9a610
+Create Date: 2026-10-18 15:12:37.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e1f7b3d2'
+down_revision: Union[str, Sequence[str], None] = 'f3b7d2e9a610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY avoids blocking sign-ups on a large user table, but cannot
+    # run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_last_name_id', 'user', ['last_name', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_user_first_name_id', 'user', ['first_name', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_user_created_at_id', 'user', ['created_at', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_created_at_id', table_name='user')
+    op.drop_index('ix_user_first_name_id', table_name='user')
+    op.drop_index('ix_user_last_name_id', table_name='user')
@@ -0,0 +1,42 @@
+"""add trigram indexes for member search
+
+Revision ID: b7e2d94c1f58
+Revises: a4c9e1f7b3d2
+Create Date: 2026-10-18 16:40:09.183562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d94c1f58'
+down_revision: Union[str, Sequence[str], None] = 'a4c9e1f7b3d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ['first_name', 'last_name', 'email', 'phone']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Trigram indexes serve the substring ILIKE/LIKE filters of
+    # user_crud.search. CONCURRENTLY avoids blocking writes, but cannot run
+    # inside a transaction.
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.create_index(
+                f'ix_user_{column}_trgm', 'user', [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The extension is left installed; other objects may depend on it
+    for column in reversed(SEARCH_COLUMNS):
+        op.drop_index(f'ix_user_{column}_trgm', table_name='user')
@@ -0,0 +1,52 @@
+"""add activity confirmed_count and one live booking per member
+
+Revision ID: c5f1a9d3e7b2
+Revises: 8d41f0c6b2a9
+Create Date: 2026-10-18 11:24:36.905142
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a9d3e7b2'
+down_revision: Union[str, Sequence[str], None] = '8d41f0c6b2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'activity',
+        sa.Column('confirmed_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE activity SET confirmed_count = c.confirmed_count
+          FROM (SELECT activity_id, count(*) AS confirmed_count
+                  FROM activity_booking
+                 WHERE booking_status = 'CONFIRMED'
+                 GROUP BY activity_id) c
+         WHERE c.activity_id = activity.id
+        """
+    )
+    # CONCURRENTLY avoids blocking writes on large tables, but cannot run
+    # inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_activity_booking_active_user', 'activity_booking',
+            ['activity_id', 'user_id'],
+            unique=True,
+            postgresql_where=sa.text("booking_status != 'CANCELLED'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_activity_booking_active_user', table_name='activity_booking')
+    op.drop_column('activity', 'confirmed_count')
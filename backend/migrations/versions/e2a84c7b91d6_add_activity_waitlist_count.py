@@ -0,0 +1,51 @@
+"""add activity waitlist_count
+
+Revision ID: e2a84c7b91d6
+Revises: c5f1a9d3e7b2
+Create Date: 2026-10-18 12:40:19.362207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a84c7b91d6'
+down_revision: Union[str, Sequence[str], None] = 'c5f1a9d3e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'activity',
+        sa.Column('waitlist_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE activity SET waitlist_count = w.waitlist_count
+          FROM (SELECT activity_id, count(*) AS waitlist_count
+                  FROM activity_booking
+                 WHERE booking_status = 'WAITLIST'
+                 GROUP BY activity_id) w
+         WHERE w.activity_id = activity.id
+        """
+    )
+    # Listings read confirmed_count now; the attendee and reconcile queries
+    # use ix_activity_booking_activity_id_status
+    op.drop_index(
+        'ix_activity_booking_confirmed_activity_id', table_name='activity_booking'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_activity_booking_confirmed_activity_id', 'activity_booking',
+        ['activity_id'],
+        postgresql_where=sa.text("booking_status = 'CONFIRMED'"),
+    )
+    op.drop_column('activity', 'waitlist_count')
@@ -0,0 +1,36 @@
+"""add activity created_at and updated_at
+
+Revision ID: f3b7d2e9a610
+Revises: e2a84c7b91d6
+Create Date: 2026-10-18 14:05:52.218764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7d2e9a610'
+down_revision: Union[str, Sequence[str], None] = 'e2a84c7b91d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'activity',
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    )
+    op.add_column(
+        'activity',
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('activity', 'updated_at')
+    op.drop_column('activity', 'created_at')
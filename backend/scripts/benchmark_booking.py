@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark the booking engine under contention for a single activity.
+
+Usage:
+    python -m scripts.benchmark_booking [--bookers 500] [--capacity 20]
+        [--workers 32] [--url URL]
+
+Creates the tables in a scratch `booking_benchmark` schema and lets N members
+book the same activity concurrently, once with the naive read-count-then-insert
+approach and once with booking_crud.book (atomic conditional UPDATE on
+activity.confirmed_count). Prints throughput, latency percentiles and how many
+bookings were confirmed against the capacity. The scratch schema is dropped
+afterwards.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.crud.booking import booking_crud
+from src.database import Base
+from src.models.activity import Activity, ActivityBooking, BookingStatus
+from src.models.user import User
+
+SCHEMA = "booking_benchmark"
+
+
+def naive_book(db, activity_id: int, user_id: int) -> BookingStatus:
+    """Read-count-then-insert, the approach the booking engine replaces."""
+    activity = db.get(Activity, activity_id)
+    confirmed = (
+        db.query(func.count(ActivityBooking.id))
+        .filter(
+            ActivityBooking.activity_id == activity_id,
+            ActivityBooking.booking_status == BookingStatus.CONFIRMED,
+        )
+        .scalar()
+    )
+    booking_status = (
+        BookingStatus.CONFIRMED
+        if confirmed < activity.max_capacity
+        else BookingStatus.WAITLIST
+    )
+    db.add(
+        ActivityBooking(
+            user_id=user_id,
+            activity_id=activity_id,
+            credits_used=activity.credits_required,
+            booking_status=booking_status,
+        )
+    )
+    db.commit()
+    return booking_status
+
+
+def engine_book(db, activity_id: int, user_id: int) -> BookingStatus:
+    return booking_crud.book(db, activity_id, user_id).booking_status
+
+
+def setup(SessionLocal, bookers: int, capacity: int) -> tuple[int, list[int]]:
+    """Create one upcoming activity and the members who will book it."""
+    with SessionLocal() as db:
+        db.query(ActivityBooking).delete()
+        db.query(Activity).delete()
+        db.query(User).delete()
+        users = [
+            User(email=f"booker{i}@example.com", first_name="Booker", last_name=str(i))
+            for i in range(bookers)
+        ]
+        db.add_all(users)
+        db.flush()
+        activity = Activity(
+            name="Peak hour class",
+            coach_id=users[0].id,
+            start_time=datetime.now() + timedelta(days=1),
+            duration=60,
+            credits_required=1,
+            max_capacity=capacity,
+        )
+        db.add(activity)
+        db.commit()
+        return activity.id, [user.id for user in users]
+
+
+def run(SessionLocal, book, args) -> None:
+    activity_id, user_ids = setup(SessionLocal, args.bookers, args.capacity)
+    latencies = []
+
+    def attempt(user_id: int) -> BookingStatus:
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            booking_status = book(db, activity_id, user_id)
+        latencies.append(time.perf_counter() - started)
+        return booking_status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        statuses = list(pool.map(attempt, user_ids))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    quantiles = statistics.quantiles(latencies_ms, n=100)
+    confirmed = statuses.count(BookingStatus.CONFIRMED)
+    print(f"\n=== {book.__name__}")
+    print(
+        f"  {len(statuses)} bookings in {elapsed:.2f}s ({len(statuses) / elapsed:.0f}/s)"
+    )
+    print(
+        f"  latency ms: p50 {quantiles[49]:.1f}  p95 {quantiles[94]:.1f}"
+        f"  p99 {quantiles[98]:.1f}  max {latencies_ms[-1]:.1f}"
+    )
+    print(
+        f"  confirmed {confirmed} / capacity {args.capacity}"
+        f" ({'OVERSOLD' if confirmed > args.capacity else 'ok'}),"
+        f" waitlisted {statuses.count(BookingStatus.WAITLIST)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bookers", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        args.url, pool_size=args.workers, max_overflow=0
+    ).execution_options(schema_translate_map={None: SCHEMA})
+    SessionLocal = sessionmaker(bind=engine)
+
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        Base.metadata.create_all(conn)
+        conn.commit()
+    try:
+        for book in (naive_book, engine_book):
+            run(SessionLocal, book, args)
+    finally:
+        with engine.connect() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark the query indexes against a large synthetic data set.
+
+Usage:
+    python -m scripts.benchmark_indexes [--bookings 1000000] [--url URL]
+
+Creates the tables in a scratch `index_benchmark` schema, seeds them with
+generated users, activities and bookings, then prints the EXPLAIN ANALYZE
+plan of each hot query first without and then with the secondary indexes
+declared on the models. The scratch schema is dropped afterwards.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.database import Base
+from src.models.activity import Activity, ActivityBooking
+from src.models.user import User, UserRole
+
+SCHEMA = "index_benchmark"
+
+QUERIES = {
+    "timetable week, grouped counts": """
+        SELECT a.id, a.start_time, coalesce(c.booked_count, 0)
+          FROM activity a
+          LEFT JOIN (SELECT activity_id, count(id) AS booked_count
+                       FROM activity_booking
+                      WHERE booking_status = 'CONFIRMED'
+                      GROUP BY activity_id) c ON c.activity_id = a.id
+         WHERE a.start_time >= :week_start AND a.start_time < :week_end
+         ORDER BY a.start_time, a.id
+         LIMIT 51
+    """,
+    "timetable week, correlated counts": """
+        SELECT a.id, a.start_time,
+               (SELECT count(*) FROM activity_booking b
+                 WHERE b.activity_id = a.id
+                   AND b.booking_status = 'CONFIRMED') AS booked_count
+          FROM activity a
+         WHERE a.start_time >= :week_start AND a.start_time < :week_end
+         ORDER BY a.start_time, a.id
+         LIMIT 51
+    """,
+    "coach timetable (get_activities coach_id)": """
+        SELECT a.id, a.start_time
+          FROM activity a
+         WHERE a.coach_id = :coach_id AND a.start_time >= :week_start
+         ORDER BY a.start_time, a.id
+         LIMIT 51
+    """,
+    "member bookings": """
+        SELECT b.id, b.activity_id, b.booking_status
+          FROM activity_booking b
+         WHERE b.user_id = :user_id
+    """,
+    "activity waitlist": """
+        SELECT b.id
+          FROM activity_booking b
+         WHERE b.activity_id = :activity_id AND b.booking_status = 'WAITLIST'
+         ORDER BY b.id
+    """,
+    "coaches (get_users_by_role)": """
+        SELECT u.id, u.email
+          FROM "user" u
+          JOIN user_role ur ON ur.user_id = u.id
+          JOIN role r ON r.id = ur.role_id
+         WHERE r.name = 'COACH'
+    """,
+}
+
+
+def secondary_indexes():
+    tables = [User.__table__, UserRole.__table__, Activity.__table__]
+    tables.append(ActivityBooking.__table__)
+    return [index for table in tables for index in table.indexes]
+
+
+def seed(conn, num_bookings: int) -> dict:
+    """Fill the scratch schema with generated rows using set-based inserts."""
+    num_activities = max(num_bookings // 40, 10)
+    num_users = max(num_bookings // 20, 100)
+    num_coaches = 50
+
+    conn.execute(
+        text(
+            "INSERT INTO role (id, name) VALUES (1, 'CLIENT'), (2, 'COACH'), (3, 'ADMIN')"
+        )
+    )
+    conn.execute(
+        text("""
+            INSERT INTO "user" (email, first_name, last_name, phone, hashed_password)
+            SELECT 'member' || g || '@example.com', 'First' || g, 'Last' || g,
+                   lpad(g::text, 10, '0'), 'x'
+              FROM generate_series(1, :n) g
+            """),
+        {"n": num_users},
+    )
+    conn.execute(
+        text("""
+            INSERT INTO user_role (user_id, role_id)
+            SELECT id, CASE WHEN id <= :coaches THEN 2 ELSE 1 END FROM "user"
+            """),
+        {"coaches": num_coaches},
+    )
+    conn.execute(
+        text("""
+            INSERT INTO activity (name, description, coach_id, start_time, duration,
+                                  credits_required, max_capacity)
+            SELECT 'Class ' || g, 'Generated', 1 + (g % :coaches),
+                   now() - interval '365 days' + (g * interval '730 days' / :n),
+                   60, 1, 50
+              FROM generate_series(1, :n) g
+            """),
+        {"n": num_activities, "coaches": num_coaches},
+    )
+    conn.execute(
+        text("""
+            INSERT INTO activity_booking (user_id, activity_id, credits_used,
+                                          booking_status)
+            SELECT 1 + floor(random() * :users)::int,
+                   1 + floor(random() * :activities)::int,
+                   1,
+                   (CASE WHEN r < 0.8 THEN 'CONFIRMED'
+                         WHEN r < 0.9 THEN 'CANCELLED'
+                         ELSE 'WAITLIST' END)::activity_booking_status
+              FROM (SELECT random() AS r FROM generate_series(1, :n)) s
+            """),
+        {"n": num_bookings, "users": num_users, "activities": num_activities},
+    )
+    return {
+        "week_start": datetime.now(),
+        "week_end": datetime.now() + timedelta(days=7),
+        "coach_id": 7,
+        "user_id": num_users // 2,
+        "activity_id": num_activities // 2,
+    }
+
+
+def explain(conn, sql: str, params: dict) -> tuple[str, float]:
+    """Return the plan text and execution time (ms) of a query."""
+    rows = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params).all()
+    plan = "\n".join(row[0] for row in rows)
+    execution_ms = float(plan.rsplit("Execution Time: ", 1)[1].split(" ")[0])
+    return plan, execution_ms
+
+
+def run_queries(conn, params: dict, verbose: bool) -> dict:
+    timings = {}
+    for name, sql in QUERIES.items():
+        explain(conn, sql, params)  # warm the cache
+        plan, execution_ms = explain(conn, sql, params)
+        timings[name] = execution_ms
+        if verbose:
+            print(f"\n--- {name}\n{plan}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    parser.add_argument(
+        "--quiet", action="store_true", help="Only print the timing summary"
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.url).execution_options(
+        schema_translate_map={None: SCHEMA}
+    )
+    indexes = secondary_indexes()
+
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        conn.commit()
+        try:
+            Base.metadata.create_all(conn)
+            for index in indexes:
+                conn.execute(text(f"DROP INDEX {SCHEMA}.{index.name}"))
+
+            print(f"Seeding {args.bookings:,} bookings...")
+            params = seed(conn, args.bookings)
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+
+            print("\n=== Without secondary indexes")
+            before = run_queries(conn, params, verbose=not args.quiet)
+
+            for index in indexes:
+                index.create(conn)
+            conn.execute(text("ANALYZE"))
+            conn.commit()
+
+            print("\n=== With secondary indexes")
+            after = run_queries(conn, params, verbose=not args.quiet)
+
+            print(f"\n{'query':45} {'before ms':>12} {'after ms':>12}")
+            for name in QUERIES:
+                print(f"{name:45} {before[name]:12.2f} {after[name]:12.2f}")
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Detect and repair drift in the activity booking counters.
+
+Usage:
+    python -m scripts.reconcile_booking_counts [--fix] [--batch-size 500]
+
+Compares activity.confirmed_count and activity.waitlist_count with the
+bookings they count and reports every activity that disagrees. With --fix the
+counters are recounted under a row lock, in batches, and any spot found free
+is offered to the waitlist.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add the project root directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crud.booking import booking_crud
+from src.database import SessionLocal
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def reconcile(fix: bool = False, batch_size: int = 500) -> int:
+    """Report, and optionally repair, activities with drifted counters.
+
+    Returns:
+        The number of activities found with drift.
+    """
+    db = SessionLocal()
+    try:
+        drift = booking_crud.find_count_drift(db)
+        db.rollback()
+        for row in drift:
+            logger.info(
+                f"Activity {row.id}: confirmed_count {row.confirmed_count} "
+                f"(counted {row.confirmed}), waitlist_count {row.waitlist_count} "
+                f"(counted {row.waitlist})"
+            )
+        logger.info(f"{len(drift)} activities with drifted booking counters")
+
+        if fix:
+            activity_ids = [row.id for row in drift]
+            for start in range(0, len(activity_ids), batch_size):
+                batch = activity_ids[start : start + batch_size]
+                promoted = booking_crud.reconcile_counts(db, batch)
+                logger.info(
+                    f"Repaired {len(batch)} activities, "
+                    f"promoted {len(promoted)} waitlisted bookings"
+                )
+        return len(drift)
+    except Exception as e:
+        logger.error(f"Error reconciling booking counters: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--fix", action="store_true", help="Repair the drifted counters"
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    reconcile(fix=args.fix, batch_size=args.batch_size)
@@ -1,50 +1,97 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError as JWTError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
+from src.config import settings
+from src.core.cache import principal_cache, role_version_cache
 from src.core.security import decode_token
 from src.crud.user import user_crud
 from src.database import get_db
-from src.models.user import User
+from src.models.user import RoleName
 from src.schemas.token import TokenData
+from src.schemas.user import UserPrincipal
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db),
-) -> User:
-    """Get the current authenticated user from the token."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    token_data = decode_token(token)
-    if not token_data:
-        raise credentials_exception
 
-    email: str = token_data.get("sub")
-    if email is None:
-        raise credentials_exception
+def _forbidden_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="The user doesn't have enough privileges",
+    )
+
+
+def get_token_claims(token: Annotated[str, Depends(oauth2_scheme)]) -> TokenData:
+    """Decode the bearer token into its claims, without touching the database."""
+    payload = decode_token(token)
+    if not payload or payload.get("sub") is None:
+        raise _credentials_exception()
 
-    user = user_crud.get_user_by_email(db, email=email)
-    if user is None:
-        raise credentials_exception
+    try:
+        return TokenData(
+            email=payload["sub"],
+            user_id=payload.get("uid"),
+            scopes=payload.get("scopes", []),
+            role_version=payload.get("rv"),
+            issued_at=(
+                datetime.fromtimestamp(payload["iat"], tz=timezone.utc)
+                if "iat" in payload
+                else None
+            ),
+        )
+    except ValidationError:
+        raise _credentials_exception()
 
-    return user
+
+def get_current_user(
+    claims: Annotated[TokenData, Depends(get_token_claims)],
+    db: Session = Depends(get_db),
+) -> UserPrincipal:
+    """Get the current authenticated user from the token.
+
+    Principals are cached per process by token subject, so repeat requests
+    skip the database. `UserCRUDRepository` invalidates the entry whenever
+    the user or their roles change.
+    """
+    principal = principal_cache.get(claims.email)
+    if principal is None or (
+        # The roles changed after this process cached the principal, e.g.
+        # through another worker; reload instead of rejecting the new token
+        claims.role_version is not None
+        and claims.role_version > principal.role_version
+    ):
+        principal = user_crud.get_principal(db, email=claims.email)
+        if principal is None:
+            raise _credentials_exception()
+        principal_cache.set(claims.email, principal)
+
+    # Tokens issued before the user's last role change carry stale roles
+    if (
+        claims.role_version is not None
+        and claims.role_version != principal.role_version
+    ):
+        raise _credentials_exception()
+
+    return principal
 
 
 def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[UserPrincipal, Depends(get_current_user)],
+) -> UserPrincipal:
     """Get the current active user."""
     # You can add additional checks here if needed
     # For example, if you have an 'is_active' field
@@ -54,12 +101,52 @@ def get_current_active_user(
 
 
 def get_current_admin(
-    current_user: Annotated[User, Depends(get_current_active_user)],
-) -> User:
+    current_user: Annotated[UserPrincipal, Depends(get_current_active_user)],
+) -> UserPrincipal:
     """Check if the current user is an admin."""
-    if not any(role.name == "admin" for role in current_user.roles):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="The user doesn't have enough privileges",
-        )
+    if RoleName.ADMIN.value not in current_user.roles:
+        raise _forbidden_exception()
     return current_user
+
+
+def _role_claims_trusted(claims: TokenData) -> bool:
+    """Whether the roles embedded in a token can be used as-is.
+
+    Role claims are trusted for ROLE_CLAIMS_MAX_AGE_MINUTES after the token
+    was issued. Tokens without role claims (issued before they existed) are
+    not trusted.
+
+    Raises:
+        HTTPException: 401 if this process has seen the user's roles change
+            since the token was issued.
+    """
+    if None in (claims.user_id, claims.role_version, claims.issued_at):
+        return False
+
+    # A newer version than the one seen here means the roles changed through
+    # another process, after which the token was issued: it is current
+    latest_version = role_version_cache.get(claims.user_id)
+    if latest_version is not None and latest_version > claims.role_version:
+        raise _credentials_exception()
+
+    max_age = timedelta(minutes=settings.ROLE_CLAIMS_MAX_AGE_MINUTES)
+    return datetime.now(timezone.utc) - claims.issued_at <= max_age
+
+
+def get_admin_claims(
+    claims: Annotated[TokenData, Depends(get_token_claims)],
+    db: Session = Depends(get_db),
+) -> TokenData:
+    """Check that the token belongs to an admin, trusting its signed role claims.
+
+    Intended for read endpoints: while the role claims are fresh this does
+    no database work at all. Older tokens fall back to `get_current_admin`,
+    which also rejects tokens whose role_version is out of date.
+    """
+    if _role_claims_trusted(claims):
+        if RoleName.ADMIN.value not in claims.scopes:
+            raise _forbidden_exception()
+        return claims
+
+    get_current_admin(get_current_active_user(get_current_user(claims, db)))
+    return claims
@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from src.core.pagination import InvalidCursorError, decode_cursor, paginate
+from src.crud.user import user_crud
+from src.models.user import RoleName
+from src.schemas.user import (
+    SortOrder,
+    UserPage,
+    UserResponse,
+    UserSortField,
+    UserWithRolesPage,
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _parse_cursor(cursor: Optional[str], sort_by: UserSortField) -> Optional[Tuple]:
+    """Decode a directory cursor into its (sort_by value, id) keyset.
+
+    Cursors name the column they were issued for, so one cannot be replayed
+    against a different sort order.
+    """
+    if cursor is None:
+        return None
+    try:
+        cursor_sort, value, user_id = decode_cursor(cursor)
+        if cursor_sort != sort_by.value:
+            raise InvalidCursorError("Cursor belongs to another sort order")
+        if sort_by == UserSortField.CREATED_AT:
+            value = datetime.fromisoformat(value)
+        return value, int(user_id)
+    except (InvalidCursorError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def user_directory_page(
+    db: Session,
+    role: Optional[RoleName],
+    sort_by: UserSortField,
+    order: SortOrder,
+    limit: int,
+    cursor: Optional[str],
+    with_roles: bool = False,
+) -> Response:
+    """Load and serialize one page of the user directory.
+
+    The page is validated in one `model_validate` call and written out as
+    JSON, instead of converting users one by one and having the response
+    model validate them all again. With `with_roles`, the role names of the
+    whole page are loaded with one more query.
+    """
+    after = _parse_cursor(cursor, sort_by)
+    users = user_crud.get_directory(
+        db,
+        role_name=role,
+        sort_by=sort_by.value,
+        descending=order == SortOrder.DESC,
+        limit=limit + 1,
+        after=after,
+    )
+    items, next_cursor = paginate(
+        users,
+        limit,
+        lambda user: (sort_by.value, getattr(user, sort_by.value), user.id),
+    )
+    if with_roles:
+        roles = user_crud.roles_for_users(db, [user.id for user in items])
+        page = UserWithRolesPage.model_validate(
+            {
+                "items": [
+                    {
+                        **{f: getattr(user, f) for f in UserResponse.model_fields},
+                        "roles": roles[user.id],
+                    }
+                    for user in items
+                ],
+                "next_cursor": next_cursor,
+            }
+        )
+    else:
+        page = UserPage.model_validate(
+            {"items": items, "next_cursor": next_cursor}, from_attributes=True
+        )
+    return Response(content=page.model_dump_json(), media_type="application/json")
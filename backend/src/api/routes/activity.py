@@ -1,17 +1,133 @@
-from datetime import date
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Callable, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
-from src.api.dependencies import get_current_active_user
+from src.api.dependencies import get_current_active_user, get_current_admin
+from src.core.cache import timetable_cache
+from src.core.etag import etag_matches, make_etag
+from src.core.pagination import InvalidCursorError, decode_cursor, paginate
 from src.crud.activity import activity_crud
-from src.database import get_db
-from src.models.user import User
-from src.schemas.activity import ActivityBase, ActivityResponse
+from src.crud.booking import (
+    ActivityNotFoundError,
+    ActivityStartedError,
+    AlreadyBookedError,
+    BookingNotFoundError,
+    BookingUnavailableError,
+    InvalidCapacityError,
+    booking_crud,
+)
+from src.crud.user import user_crud
+from src.database import get_db, get_read_db
+from src.models.activity import Activity
+from src.schemas.activity import (
+    ActivityBase,
+    ActivityPage,
+    ActivityResponse,
+    ActivityUpdate,
+    BookingResponse,
+)
+from src.schemas.user import UserPrincipal
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_SIZE = 1000
+INCLUDE_OPTIONS = {"attendees"}
+
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode an activity cursor into its (start_time, id) keyset."""
+    if cursor is None:
+        return None
+    try:
+        start_time, activity_id = decode_cursor(cursor)
+        return datetime.fromisoformat(start_time), int(activity_id)
+    except (InvalidCursorError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def _parse_include(include: Optional[str]) -> set:
+    """Parse the comma-separated `include` expansions of a listing request."""
+    if not include:
+        return set()
+    expansions = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = expansions - INCLUDE_OPTIONS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include option(s): {', '.join(sorted(unknown))}",
+        )
+    return expansions
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+def _page_key(activity: dict) -> Tuple[datetime, int]:
+    return activity["start_time"], activity["id"]
+
+
+def _cached_page(
+    request: Request,
+    limit: int,
+    load_version: Callable[[], tuple],
+    load_activities: Callable[[], List[dict]],
+) -> Response:
+    """Serve a listing page from the timetable cache, building it on a miss.
+
+    Pages are cached serialized together with their ETag, keyed by path and
+    query string, so a hit skips both the query and response validation. On
+    a miss the cheap version query runs first, and a client already holding
+    that version gets a 304 without the listing query running at all.
+    """
+    key = timetable_cache.key(
+        request.url.path, tuple(sorted(request.query_params.multi_items()))
+    )
+    if_none_match = request.headers.get("if-none-match")
+    cached = timetable_cache.get(key)
+    if cached is None:
+        try:
+            etag = make_etag(*key[1:], *load_version())
+            if etag_matches(if_none_match, etag):
+                return _not_modified(etag)
+            items, next_cursor = paginate(load_activities(), limit, _page_key)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error retrieving activities: {str(e)}"
+            )
+        body = ActivityPage(items=items, next_cursor=next_cursor).model_dump_json()
+        cached = (etag, body)
+        timetable_cache.set(key, cached)
+
+    etag, body = cached
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
 
 # TODO: View current bookings for a specific client (and/or for 'me', as a client viewing their own bookings)
 
@@ -21,30 +137,53 @@ router = APIRouter()
 
 @router.get(
     "/",
-    response_model=List[ActivityResponse],
+    response_model=ActivityPage,
     status_code=status.HTTP_200_OK,
     summary="Get all activities",
 )
-async def get_all_activities(db: Session = Depends(get_db)):
-    try:
-        activities = activity_crud.get_activities(db=db)
-        return activities
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error retrieving activities: {str(e)}"
-        )
+def get_all_activities(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="The next_cursor returned by the previous page"
+    ),
+    include: Optional[str] = Query(
+        None,
+        description="Comma-separated expansions. 'attendees' embeds the attendee list",
+    ),
+):
+    after = _parse_cursor(cursor)
+    expansions = _parse_include(include)
+    return _cached_page(
+        request,
+        limit,
+        lambda: activity_crud.get_activities_version(
+            db=db, include_attendees="attendees" in expansions
+        ),
+        lambda: activity_crud.get_activities(
+            db=db,
+            limit=limit + 1,
+            after=after,
+            include_attendees="attendees" in expansions,
+        ),
+    )
 
 
-@router.get("/filtered")
-async def get_activities(
-    db: Session = Depends(get_db),
+@router.get("/filtered", response_model=ActivityPage)
+def get_activities(
+    request: Request,
+    db: Session = Depends(get_read_db),
     # current_user: User = Depends(get_current_active_user),
     coach_id: Optional[int] = Query(None, description="Filter by coach ID"),
     start_date: Optional[date] = Query(
-        None, description="Filter activities after this date (YYYY-MM-DD)"
+        None, description="Only activities starting on or after this date (YYYY-MM-DD)"
     ),
     end_date: Optional[date] = Query(
-        None, description="Filter activities before this date (YYYY-MM-DD)"
+        None,
+        description="Only activities starting before this date, exclusive (YYYY-MM-DD)",
     ),
     min_available_spots: Optional[int] = Query(
         None,
@@ -52,31 +191,67 @@ async def get_activities(
         description="Filter activities with at least this many spots available",
     ),
     include_past: bool = Query(False, description="Whether to include past activities"),
+    limit: int = Query(
+        DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="The next_cursor returned by the previous page"
+    ),
+    include: Optional[str] = Query(
+        None,
+        description="Comma-separated expansions. 'attendees' embeds the attendee list",
+    ),
 ):
     """
     Retrieve activities with optional filtering.
 
     Available filters:
     - coach_id: Filter by coach
-    - start_date: Only show activities after this date
-    - end_date: Only show activities before this date
+    - start_date: Only show activities starting on or after this date
+    - end_date: Only show activities starting before this date. Together with
+      start_date this is the half-open range [start_date, end_date), e.g.
+      start_date=2025-03-03&end_date=2025-03-10 for one calendar week
     - min_available_spots: Only show activities with at least this many spots available
     - include_past: Whether to include past activities (default: False)
+    - include: 'attendees' to embed the attendee list (default: counts only)
+
+    Results are ordered by (start_time, id) and paginated with an opaque
+    cursor: pass the returned `next_cursor` to fetch the following page.
+    Pages are cached briefly and refreshed whenever activities or bookings
+    change. Responses carry an ETag; send it back in If-None-Match to get a
+    304 when nothing changed.
     """
-    try:
-        activities = activity_crud.get_activities(
+    if start_date and end_date and end_date <= start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must be after start_date",
+        )
+    after = _parse_cursor(cursor)
+    expansions = _parse_include(include)
+    return _cached_page(
+        request,
+        limit,
+        lambda: activity_crud.get_activities_version(
             db=db,
             coach_id=coach_id,
             start_date=start_date,
             end_date=end_date,
             min_available_spots=min_available_spots,
             include_past=include_past,
-        )
-        return activities
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Error retrieving activities: {str(e)}"
-        )
+            include_attendees="attendees" in expansions,
+        ),
+        lambda: activity_crud.get_activities(
+            db=db,
+            coach_id=coach_id,
+            start_date=start_date,
+            end_date=end_date,
+            min_available_spots=min_available_spots,
+            include_past=include_past,
+            limit=limit + 1,
+            after=after,
+            include_attendees="attendees" in expansions,
+        ),
+    )
 
 
 @router.post(
@@ -85,7 +260,7 @@ async def get_activities(
     status_code=status.HTTP_201_CREATED,
     summary="Create a new activity",
 )
-async def create_activity(
+def create_activity(
     activity_data: ActivityBase,
     db: Session = Depends(get_db),
     # current_user: User = Depends(get_current_active_user)
@@ -98,10 +273,8 @@ async def create_activity(
     """
     try:
         db_activity = activity_crud.create(db=db, obj_create=activity_data)
-        db.commit()
-        db.refresh(db_activity)
 
-        coach = db.query(User).filter(User.id == activity_data.coach_id).first()
+        coach = user_crud.loader(db).load(activity_data.coach_id)
 
         return {
             **activity_data.model_dump(),
@@ -120,3 +293,134 @@ async def create_activity(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error creating activity: {str(e)}",
         )
+
+
+def _activity_responses(db: Session, activities: List[Activity]) -> List[dict]:
+    """Build activity responses, loading all their coaches with one query."""
+    coaches = user_crud.loader(db).load_many(a.coach_id for a in activities)
+    return [
+        {
+            **{field: getattr(activity, field) for field in ActivityBase.model_fields},
+            "id": activity.id,
+            "coach_first_name": coach.first_name if coach else "",
+            "coach_last_name": coach.last_name if coach else "",
+            "attendee_count": activity.confirmed_count,
+            "spots_left": activity.max_capacity - activity.confirmed_count,
+            "waitlist_count": activity.waitlist_count,
+        }
+        for activity, coach in zip(activities, coaches)
+    ]
+
+
+@router.post(
+    "/batch",
+    response_model=List[ActivityResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create many activities at once",
+)
+def create_activities(
+    activities: List[ActivityBase] = Body(..., max_length=MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    admin: UserPrincipal = Depends(get_current_admin),
+):
+    """Create up to MAX_BATCH_SIZE activities in a single transaction.
+
+    Either every activity is created or, on error, none is.
+    """
+    try:
+        created = activity_crud.bulk_create(db, activities)
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error creating activities: {e.orig}",
+        )
+    return _activity_responses(db, created)
+
+
+@router.patch(
+    "/batch",
+    response_model=List[ActivityResponse],
+    summary="Update many activities at once",
+)
+def update_activities(
+    activities: List[ActivityUpdate] = Body(..., max_length=MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    admin: UserPrincipal = Depends(get_current_admin),
+):
+    """Apply partial updates to up to MAX_BATCH_SIZE activities.
+
+    Only the fields sent for an activity are changed; they cannot be set to
+    null. A capacity cannot drop below the confirmed bookings, and a raised
+    one is filled from the waitlist. Either every update is applied or, on
+    error, none is.
+    """
+    try:
+        updated = activity_crud.bulk_update(db, activities)
+    except StaleDataError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="One or more activities not found",
+        )
+    except InvalidCapacityError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error updating activities: {e.orig}",
+        )
+    return _activity_responses(db, updated)
+
+
+@router.post("/batch/delete", summary="Delete many activities at once")
+def delete_activities(
+    ids: List[int] = Body(..., embed=True, max_length=MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    admin: UserPrincipal = Depends(get_current_admin),
+):
+    """Delete activities and their bookings. Unknown ids are ignored."""
+    return {"deleted": activity_crud.bulk_delete(db, ids)}
+
+
+@router.post(
+    "/{activity_id}/book",
+    response_model=BookingResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Book the current user onto an activity",
+)
+def book_activity(
+    activity_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+):
+    """Book a spot, or join the waitlist when the activity is full.
+
+    The returned `booking_status` is `confirmed` when a spot was reserved and
+    `waitlist` otherwise.
+    """
+    try:
+        return booking_crud.book(db, activity_id=activity_id, user_id=current_user.id)
+    except ActivityNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (ActivityStartedError, AlreadyBookedError, BookingUnavailableError) as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.delete(
+    "/{activity_id}/book",
+    response_model=BookingResponse,
+    summary="Cancel the current user's booking of an activity",
+)
+def cancel_booking(
+    activity_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+):
+    """Cancel a confirmed or waitlisted booking.
+
+    Cancelling a confirmed booking promotes the oldest waitlisted booking of
+    the activity.
+    """
+    try:
+        return booking_crud.cancel(db, activity_id=activity_id, user_id=current_user.id)
+    except BookingNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -2,58 +2,67 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.dependencies import get_db
-from src.core.security import verify_password, create_access_token
+from src.database import get_async_db
+from src.core.security import averify_password, create_access_token
 from src.crud.user import user_crud
+from src.models.user import User
 from src.schemas.token import Token, UserLogin
 from src.config import settings
 
 router = APIRouter(tags=["auth"])
 
 
+async def _issue_token(db: AsyncSession, user: User) -> Token:
+    """Create an access token carrying the user's roles as signed claims."""
+    roles = await user_crud.aget_user_roles(db, user.id)
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "scopes": roles,
+            "rv": user.role_version,
+        },
+        expires_delta=access_token_expires,
+    )
+    return Token(access_token=access_token, token_type="bearer")
+
+
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Token:
     """OAuth2 compatible token login, get an access token for future requests."""
-    user = user_crud.get_user_by_email(db, email=form_data.username)
+    user = await user_crud.aget_user_by_email(db, email=form_data.username)
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await averify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-
-    return Token(access_token=access_token, token_type="bearer")
+    return await _issue_token(db, user)
 
 
 @router.post("/login", response_model=Token)
 async def login(
     user_login: UserLogin,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Token:
     """Alternative login endpoint that accepts JSON."""
-    user = user_crud.get_user_by_email(db, email=user_login.email)
+    user = await user_crud.aget_user_by_email(db, email=user_login.email)
 
-    if not user or not verify_password(user_login.password, user.hashed_password):
+    if not user or not await averify_password(
+        user_login.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-
-    return Token(access_token=access_token, token_type="bearer")
+    return await _issue_token(db, user)
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_admin_claims
+from src.core.export import MEDIA_TYPES, ExportFormat, render
+from src.crud.activity import activity_crud
+from src.crud.booking import booking_crud
+from src.database import get_read_db
+from src.models.activity import Activity, ActivityBooking
+from src.schemas.token import TokenData
+
+router = APIRouter()
+
+EXPORT_BATCH_SIZE = 1000
+
+ACTIVITY_COLUMNS = [
+    Activity.id,
+    Activity.name,
+    Activity.description,
+    Activity.coach_id,
+    Activity.start_time,
+    Activity.duration,
+    Activity.credits_required,
+    Activity.max_capacity,
+    Activity.confirmed_count,
+    Activity.waitlist_count,
+]
+
+BOOKING_COLUMNS = [
+    ActivityBooking.id,
+    ActivityBooking.activity_id,
+    ActivityBooking.user_id,
+    ActivityBooking.credits_used,
+    ActivityBooking.booking_status,
+]
+
+
+def _export_response(
+    batches, export_format: ExportFormat, columns, name: str
+) -> StreamingResponse:
+    # `batches` reads from the request's session while the body is sent.
+    # Since 0.118 (the minimum in requirements.txt) FastAPI closes `yield`
+    # dependencies only after the response is finished.
+    filename = f"{name}-{datetime.now():%Y%m%d%H%M%S}.{export_format.value}"
+    return StreamingResponse(
+        render(batches, export_format, [column.key for column in columns]),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/activities",
+    status_code=status.HTTP_200_OK,
+    summary="Export the full schedule",
+    response_class=StreamingResponse,
+)
+def export_activities(
+    db: Session = Depends(get_read_db),
+    admin: TokenData = Depends(get_admin_claims),
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+):
+    """Stream every activity, past and upcoming, ordered by id.
+
+    Rows are read through a server-side cursor and written out batch by
+    batch, so memory use does not grow with the size of the schedule.
+    """
+    batches = activity_crud.stream(db, *ACTIVITY_COLUMNS, batch_size=EXPORT_BATCH_SIZE)
+    return _export_response(batches, format, ACTIVITY_COLUMNS, "activities")
+
+
+@router.get(
+    "/bookings",
+    status_code=status.HTTP_200_OK,
+    summary="Export the booking history",
+    response_class=StreamingResponse,
+)
+def export_bookings(
+    db: Session = Depends(get_read_db),
+    admin: TokenData = Depends(get_admin_claims),
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+):
+    """Stream every booking, in any status, ordered by id.
+
+    Rows are read through a server-side cursor and written out batch by
+    batch, so memory use does not grow with the size of the history.
+    """
+    batches = booking_crud.stream(db, *BOOKING_COLUMNS, batch_size=EXPORT_BATCH_SIZE)
+    return _export_response(batches, format, BOOKING_COLUMNS, "bookings")
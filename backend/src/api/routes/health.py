@@ -0,0 +1,44 @@
+from fastapi import APIRouter, status
+
+from src.core.cache import principal_cache, timetable_cache
+from src.core.security import password_hasher
+from src.database import async_engine, engine, pool_status, replica_router
+
+router = APIRouter()
+
+
+@router.get(
+    "/password-hashing",
+    status_code=status.HTTP_200_OK,
+    summary="Password hashing pool metrics",
+)
+def password_hashing_metrics() -> dict:
+    """Latency, queue and rejection counters for the bcrypt pool."""
+    return password_hasher.metrics.snapshot()
+
+
+@router.get(
+    "/db",
+    status_code=status.HTTP_200_OK,
+    summary="Database connection pool status",
+)
+def db_pool_status() -> dict:
+    """Checked-out, idle and overflow connections plus checkout wait times."""
+    return {
+        "primary": pool_status(engine.pool),
+        "primary_async": pool_status(async_engine.sync_engine.pool),
+        "replicas": replica_router.status(),
+    }
+
+
+@router.get(
+    "/cache",
+    status_code=status.HTTP_200_OK,
+    summary="In-process cache metrics",
+)
+def cache_metrics() -> dict:
+    """Size, hit and miss counters of the per-process caches."""
+    return {
+        "timetable": timetable_cache.stats(),
+        "principals": principal_cache.stats(),
+    }
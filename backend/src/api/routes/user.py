@@ -1,14 +1,29 @@
 from typing import List, Optional, Sequence
 
 from src.api.dependencies import get_current_active_user, get_current_user
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from src.api.routes._directory import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    user_directory_page,
+)
+from src.core.etag import etag_matches, make_etag
 from src.crud.user import UserCRUDRepository, user_crud
-from src.database import get_db
-from src.models.user import User, RoleName
-from src.schemas.user import UserCreate, UserResponse, UserUpdate, UserBase
+from src.database import get_db, get_read_db
+from src.models.user import RoleName
+from src.schemas.user import (
+    SortOrder,
+    UserBase,
+    UserCreate,
+    UserPage,
+    UserPrincipal,
+    UserResponse,
+    UserSortField,
+    UserUpdate,
+)
 
 router = APIRouter()
 
@@ -16,14 +31,25 @@ router = APIRouter()
 @router.get(
     "/all",
     status_code=status.HTTP_200_OK,
-    response_model=List[UserResponse],
+    response_model=UserPage,
     summary="Get all users",
-    response_description="List of all users",
+    response_description="One page of users",
 )
-def get_all_users(db: Session = Depends(get_db)) -> List[UserResponse]:
+def get_all_users(
+    db: Session = Depends(get_read_db),
+    role: Optional[RoleName] = Query(None, description="Only users with this role"),
+    sort_by: UserSortField = Query(UserSortField.LAST_NAME),
+    order: SortOrder = Query(SortOrder.ASC),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(
+        None, description="The next_cursor returned by the previous page"
+    ),
+) -> Response:
+    """Page through users, see `/api/v1/users/all`."""
     try:
-        users = user_crud.get_many(db=db)
-        return [UserResponse.from_orm(user) for user in users]
+        return user_directory_page(db, role, sort_by, order, limit, cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving users: {str(e)}")
 
@@ -36,7 +62,8 @@ def get_all_users(db: Session = Depends(get_db)) -> List[UserResponse]:
     response_description="The current user",
 )
 def get_current_user_info(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
 ) -> UserResponse:
     """Get Current user's information.
 
@@ -143,17 +170,31 @@ def update_user(
     response_description="List of all coaches",
 )
 def get_all_coaches(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     # current_user: User = Depends(get_current_active_user),
 ) -> Sequence[UserResponse]:
     """Get all users with coach role.
 
+    The response carries an ETag; a request whose If-None-Match matches it
+    gets a 304 without the coaches being loaded.
+
     Args:
-        db: The database session. Defaults to Depends(get_db).
+        request: The incoming request, for its If-None-Match header.
+        response: The outgoing response, for the ETag header.
+        db: The database session. Defaults to Depends(get_read_db).
         current_user: The current authenticated user. Defaults to Depends(get_current_active_user).
 
     Returns:
         List of UserResponse objects representing all coaches.
     """
+    etag = make_etag(
+        request.url.path, *user_crud.get_role_listing_version(db, RoleName.COACH)
+    )
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
     coaches = user_crud.get_users_by_role(db, RoleName.COACH)
     return coaches
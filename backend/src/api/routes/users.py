@@ -1,33 +1,143 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
+from src.api.routes._directory import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    user_directory_page,
+)
 from src.crud.user import user_crud
-from src.database import get_db
-from src.schemas.user import UserCreate, UserResponse, UserUpdate
-from src.models.user import User
-from src.api.dependencies import get_current_admin
+from src.database import get_db, get_read_db
+from src.models.user import RoleName
+from src.schemas.token import TokenData
+from src.schemas.user import (
+    SortOrder,
+    UserCreate,
+    UserPrincipal,
+    UserResponse,
+    UserSortField,
+    UserUpdate,
+    UserWithRolesPage,
+)
+from src.api.dependencies import get_admin_claims, get_current_admin
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 1000
 
-@router.get(
-    "/all", response_model=List[Optional[UserResponse]], status_code=status.HTTP_200_OK
-)
+
+@router.get("/all", response_model=UserWithRolesPage, status_code=status.HTTP_200_OK)
 def fetch_all_users(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_admin)
-) -> List[Optional[UserResponse]]:
-    """Fetches all users.
+    db: Session = Depends(get_read_db),
+    admin: TokenData = Depends(get_admin_claims),
+    role: Optional[RoleName] = Query(None, description="Only users with this role"),
+    sort_by: UserSortField = Query(UserSortField.LAST_NAME),
+    order: SortOrder = Query(SortOrder.ASC),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(
+        None, description="The next_cursor returned by the previous page"
+    ),
+) -> Response:
+    """Fetches one page of users.
 
     Args:
-        db: The db session. Defaults to Depends(get_db).
+        db: The db session. Defaults to Depends(get_read_db).
+        role: Only users with this role.
+        sort_by: The column to order by; ties are broken by id.
+        order: asc or desc.
+        limit: The page size.
+        cursor: The next_cursor of the previous page.
 
     Returns:
-        List of UserResponse models.
+        A page of users with their role names; pass its next_cursor back to
+        fetch the following page.
+    """
+    return user_directory_page(db, role, sort_by, order, limit, cursor, with_roles=True)
+
+
+@router.get("/search", response_model=List[UserResponse])
+def search_users(
+    q: str = Query(
+        ..., min_length=2, description="Part of a name, email or phone number"
+    ),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    admin: TokenData = Depends(get_admin_claims),
+) -> List[UserResponse]:
+    """Look members up by partial name, email or phone number.
+
+    Every word of `q` must match the first name, last name or email. A `q`
+    without letters, e.g. "555-0134", matches phone numbers containing its
+    digits. Members whose name, email or phone starts with the query come
+    first.
+    """
+    return user_crud.search(db, q, limit=limit)
+
+
+@router.post(
+    "/batch",
+    response_model=List[UserResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Import many users at once",
+)
+def create_users(
+    users: List[UserCreate] = Body(..., max_length=MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    admin: UserPrincipal = Depends(get_current_admin),
+) -> List[UserResponse]:
+    """Create up to MAX_BATCH_SIZE users in a single transaction.
+
+    Either every user is created or, e.g. when an email is already
+    registered, none is.
+    """
+    try:
+        return user_crud.bulk_create(db, users)
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email already registered",
+        ) from e
+
+
+@router.patch(
+    "/batch",
+    response_model=List[UserResponse],
+    summary="Update many users at once",
+)
+def update_users(
+    users: List[UserUpdate] = Body(..., max_length=MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    admin: UserPrincipal = Depends(get_current_admin),
+) -> List[UserResponse]:
+    """Update up to MAX_BATCH_SIZE users in a single transaction."""
+    try:
+        return user_crud.bulk_update(db, users)
+    except StaleDataError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="One or more users not found",
+        )
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email already registered",
+        ) from e
+
+
+@router.post("/batch/delete", summary="Delete many users at once")
+def delete_users(
+    ids: List[int] = Body(..., embed=True, max_length=MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    admin: UserPrincipal = Depends(get_current_admin),
+):
+    """Delete users. Unknown ids are ignored.
+
+    Their bookings of upcoming activities are cancelled and the freed spots
+    go to the waitlist. Past bookings and coached activities are kept,
+    detached.
     """
-    users = user_crud.get_many(db)
-    result = []
-    for user in users:
-        result.append(UserResponse.from_orm(user))
-    return result
+    return {"deleted": user_crud.bulk_delete(db, ids)}
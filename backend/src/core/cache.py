@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from src.config import settings
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds.
+
+    Entries live in a single process; anything that must be consistent across
+    workers should rely on the TTL to bound staleness.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self._timer():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """Drop every entry for which `predicate(key, value)` is true."""
+        with self._lock:
+            for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class ResponseCache(TTLCache):
+    """TTLCache for serialized responses that is invalidated wholesale.
+
+    Keys are qualified with a generation number that `invalidate` bumps, so a
+    response built from rows read before an invalidation is stored under the
+    previous generation and never served. Any object with the same `key`,
+    `get`, `set`, `invalidate` and `stats` methods (e.g. one backed by a shared
+    store) can stand in for it.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.generation = 0
+        self.invalidations = 0
+
+    def key(self, *parts: Hashable) -> tuple:
+        """Build a key for the current generation; take it before reading rows."""
+        return (self.generation, *parts)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "invalidations": self.invalidations}
+
+
+# Authenticated principals keyed by token subject (email)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Latest role_version per user id, recorded when roles change so that tokens
+# carrying older role claims are rejected without a db lookup. Entries only
+# need to outlive the window in which role claims are trusted.
+role_version_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.ROLE_CLAIMS_MAX_AGE_MINUTES * 60,
+)
+
+# Serialized activity listing pages keyed by path and query parameters;
+# invalidated by every activity and booking write
+timetable_cache = ResponseCache(
+    maxsize=settings.TIMETABLE_CACHE_MAX_SIZE,
+    ttl=settings.TIMETABLE_CACHE_TTL_SECONDS,
+)
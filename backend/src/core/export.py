@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Iterable, Iterator, List, Mapping, Sequence
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _plain(value: Any) -> Any:
+    """Convert a column value to something both JSON and CSV render plainly."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def to_ndjson(batches: Iterable[Sequence[Mapping]]) -> Iterator[str]:
+    """Render batches of rows as newline-delimited JSON, one chunk per batch."""
+    for rows in batches:
+        yield "".join(
+            json.dumps({k: _plain(v) for k, v in row.items()}) + "\n" for row in rows
+        )
+
+
+def to_csv(
+    batches: Iterable[Sequence[Mapping]], fieldnames: List[str]
+) -> Iterator[str]:
+    """Render batches of rows as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for rows in batches:
+        writer.writerows({k: _plain(v) for k, v in row.items()} for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, when there were no rows at all
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def render(
+    batches: Iterable[Sequence[Mapping]],
+    export_format: ExportFormat,
+    fieldnames: List[str],
+) -> Iterator[str]:
+    if export_format == ExportFormat.CSV:
+        return to_csv(batches, fieldnames)
+    return to_ndjson(batches)
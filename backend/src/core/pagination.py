@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the keyset values of the last row of a page into an opaque cursor.
+
+    Args:
+        values: The sort key values, e.g. (start_time, id).
+
+    Returns:
+        A URL-safe string to hand back to the client as `next_cursor`.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Datetimes come back as ISO strings; callers convert the values they
+    know to be datetimes.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+    if not isinstance(values, list):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return values
+
+
+def paginate(
+    rows: Sequence[T], limit: int, key: Callable[[T], Tuple[Any, ...]]
+) -> Tuple[List[T], Optional[str]]:
+    """Split a `limit + 1` result set into a page and the cursor for the next one.
+
+    Args:
+        rows: Rows fetched with `limit + 1` so we can tell if more exist.
+        limit: The page size requested by the client.
+        key: Returns the keyset values for a row.
+
+    Returns:
+        The page items and the next cursor (None on the last page).
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    return items, encode_cursor(*key(items[-1]))
@@ -1,5 +1,9 @@
-from datetime import datetime, timedelta
-from typing import Optional
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Sequence
 
 import jwt
 from passlib.context import CryptContext
@@ -10,24 +14,173 @@ from src.config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when too many password hashes are already queued."""
+
+
+class HashMetrics:
+    """Thread-safe latency counters for the password hashing pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.completed = 0
+            self.rejected = 0
+            self.in_flight = 0
+            self.total_seconds = 0.0
+            self.total_wait_seconds = 0.0
+            self.max_seconds = 0.0
+
+    def record_submit(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def record_reject(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def record_done(self, wait_seconds: float, total_seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_wait_seconds += wait_seconds
+            self.total_seconds += total_seconds
+            self.max_seconds = max(self.max_seconds, total_seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "avg_latency_ms": round(self.total_seconds / completed * 1000, 2),
+                "avg_queue_wait_ms": round(
+                    self.total_wait_seconds / completed * 1000, 2
+                ),
+                "max_latency_ms": round(self.max_seconds * 1000, 2),
+            }
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    while keeping the CPU-heavy work away from the request threadpool and
+    the event loop. Once `max_pending` hashes are queued or running, new
+    requests are rejected with `PasswordHashingBusyError` instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.metrics = HashMetrics()
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        with self._lock:
+            if self._pending >= self._max_pending:
+                self.metrics.record_reject()
+                raise PasswordHashingBusyError("Password hashing queue is full")
+            self._pending += 1
+        self.metrics.record_submit()
+
+        submitted_at = time.perf_counter()
+
+        def run():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                with self._lock:
+                    self._pending -= 1
+                self.metrics.record_done(
+                    started_at - submitted_at, finished_at - submitted_at
+                )
+
+        return self._executor.submit(run)
+
+    def hash(self, password: str) -> str:
+        return self._submit(pwd_context.hash, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._submit(
+            pwd_context.verify, plain_password, hashed_password
+        ).result()
+
+    def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """Hash several passwords in parallel, in submission order.
+
+        At most `max_workers` hashes are queued at a time, so a large import
+        keeps every worker busy without taking the whole `max_pending` budget
+        from concurrent logins.
+        """
+        hashes = []
+        for start in range(0, len(passwords), self._max_workers):
+            futures = [
+                self._submit(pwd_context.hash, password)
+                for password in passwords[start : start + self._max_workers]
+            ]
+            hashes.extend(future.result() for future in futures)
+        return hashes
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    async def averify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(pwd_context.verify, plain_password, hashed_password)
+        )
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+
+def get_password_hashes(passwords: Sequence[str]) -> List[str]:
+    """Hash many passwords, in order."""
+    return password_hasher.hash_many(passwords)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    return await password_hasher.averify(plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await password_hasher.ahash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=15)
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
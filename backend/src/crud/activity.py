@@ -1,11 +1,16 @@
 from datetime import datetime, date
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, Iterable, Set, Union
+
+from sqlalchemy import delete, func, select, tuple_
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
 from sqlalchemy.sql.expression import and_, or_
 
+from src.core.cache import timetable_cache
 from src.crud.base import CRUDRepository
-from src.models.activity import Activity, ActivityBooking
+from src.crud.booking import InvalidCapacityError, booking_crud
+from src.models.activity import Activity, ActivityBooking, BookingStatus
 from src.schemas.activity import ActivityResponse
 from src.models.user import User
 
@@ -14,13 +19,165 @@ class ActivityCRUDRepository(CRUDRepository):
     def __init__(self):
         super().__init__(Activity)
 
+    def _changed(self, db: Union[Session, AsyncSession], ids: Set[int]) -> None:
+        timetable_cache.invalidate()
+
+    def _updated(self, db: Session, rows: List[dict]) -> None:
+        """Keep the booking counters valid when capacities change.
+
+        Raises:
+            InvalidCapacityError: If a capacity was cleared or lowered below
+                the activity's confirmed bookings.
+        """
+        ids = {row["id"] for row in rows if "max_capacity" in row}
+        if not ids:
+            return
+        # The UPDATE holds the row locks, so no booking can slip in between
+        invalid = db.scalars(
+            select(Activity.id)
+            .where(
+                Activity.id.in_(ids),
+                or_(
+                    Activity.max_capacity.is_(None),
+                    Activity.max_capacity < Activity.confirmed_count,
+                ),
+            )
+            .order_by(Activity.id)
+        ).all()
+        if invalid:
+            raise InvalidCapacityError(
+                "Capacity must be at least the confirmed bookings of "
+                f"activities {', '.join(map(str, invalid))}"
+            )
+        # A raised capacity frees spots for the waitlist, before new bookers
+        booking_crud.promote_waitlist(db, ids)
+
+    def bulk_delete(self, db: Session, ids: Iterable[int]) -> int:
+        """Delete activities together with their bookings."""
+        ids = set(ids)
+        if ids:
+            # The ORM cascade would delete bookings one by one
+            db.execute(
+                delete(ActivityBooking).where(ActivityBooking.activity_id.in_(ids))
+            )
+        return super().bulk_delete(db, ids)
+
+    def _filter_activities(
+        self,
+        query: Query,
+        coach_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        min_available_spots: Optional[int] = None,
+        include_past: bool = False,
+    ) -> Query:
+        """Apply the listing filters shared by get_activities and its version."""
+        if coach_id is not None:
+            query = query.filter(Activity.coach_id == coach_id)
+
+        # Half-open [start_date, end_date) range on start_time, so consecutive
+        # calendar windows neither overlap nor leave gaps; the range is served
+        # by the (start_time, id) index
+        if start_date:
+            query = query.filter(
+                Activity.start_time >= datetime.combine(start_date, datetime.min.time())
+            )
+
+        if end_date:
+            query = query.filter(
+                Activity.start_time < datetime.combine(end_date, datetime.min.time())
+            )
+
+        if not include_past:
+            query = query.filter(Activity.start_time >= datetime.now())
+
+        if min_available_spots is not None:
+            query = query.filter(
+                Activity.max_capacity - Activity.confirmed_count >= min_available_spots
+            )
+        return query
+
+    def get_activities_version(
+        self,
+        db: Session,
+        coach_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        min_available_spots: Optional[int] = None,
+        include_past: bool = False,
+        include_attendees: bool = False,
+    ) -> Tuple:
+        """Cheap version of a `get_activities` listing, for ETags.
+
+        One aggregate row over the filtered activities and their coaches:
+        the count changes when activities enter or leave the filter (also
+        as time passes), the latest updated_at when any of them or their
+        coach is edited, and the counter sums when bookings change even if
+        two transactions committed out of timestamp order.
+
+        With `include_attendees` a second aggregate covers the confirmed
+        bookings and their members: the count and id sum change whenever a
+        booking is confirmed or cancelled, the latest updated_at when an
+        attendee edits their details.
+
+        Returns:
+            (count, latest activity update, latest coach update,
+            total confirmed, total waitlisted), followed by (attendee
+            bookings, sum of their ids, latest attendee update) if
+            `include_attendees`
+        """
+        filters = dict(
+            coach_id=coach_id,
+            start_date=start_date,
+            end_date=end_date,
+            min_available_spots=min_available_spots,
+            include_past=include_past,
+        )
+        version = self._filter_activities(
+            db.query(
+                func.count(Activity.id),
+                func.max(Activity.updated_at),
+                func.max(User.updated_at),
+                func.sum(Activity.confirmed_count),
+                func.sum(Activity.waitlist_count),
+            )
+            .select_from(Activity)
+            .outerjoin(Activity.coach),
+            **filters,
+        ).one()
+        if not include_attendees:
+            return tuple(version)
+
+        attendees = self._filter_activities(
+            db.query(
+                func.count(ActivityBooking.id),
+                func.sum(ActivityBooking.id),
+                func.max(User.updated_at),
+            )
+            .select_from(Activity)
+            .join(
+                ActivityBooking,
+                and_(
+                    ActivityBooking.activity_id == Activity.id,
+                    ActivityBooking.booking_status == BookingStatus.CONFIRMED,
+                ),
+            )
+            .outerjoin(User, ActivityBooking.user_id == User.id),
+            **filters,
+        ).one()
+        return (*version, *attendees)
+
     def get_activities(
         self,
         db: Session,
         coach_id: Optional[int] = None,
-        start_date: Optional[datetime] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
         min_available_spots: Optional[int] = None,
         include_past: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        include_attendees: bool = False,
     ) -> List[ActivityResponse]:
         """
         Retrieve activities with optional filtering.
@@ -28,69 +185,76 @@ class ActivityCRUDRepository(CRUDRepository):
         Args:
             db: Database session
             coach_id: Filter by coach ID
-            start_date: Filter activities after this date
+            start_date: Only activities starting on or after this date
+            end_date: Only activities starting before this date (exclusive)
             min_available_spots: Filter activities with at least this many spots available
             include_past: Whether to include past activities (default: False)
+            limit: Maximum number of activities to return
+            after: Keyset (start_time, id) of the last activity already seen;
+                only activities ordered after it are returned
+            include_attendees: Whether to load and embed the attendee list.
+                When False the booking -> user join is skipped entirely and
+                only counts and capacity are returned.
 
         Returns:
-            List of activities with attendee information
+            List of activities, with attendee information if requested
         """
         # Start building the query
-        query = db.query(Activity)
-
-        # Apply filters
-        if coach_id is not None:
-            query = query.filter(Activity.coach_id == coach_id)
+        query = self._filter_activities(
+            db.query(Activity),
+            coach_id=coach_id,
+            start_date=start_date,
+            end_date=end_date,
+            min_available_spots=min_available_spots,
+            include_past=include_past,
+        )
 
-        if start_date:
-            query = query.filter(
-                Activity.start_time >= datetime.combine(start_date, datetime.min.time())
-            )
+        if after is not None:
+            query = query.filter(tuple_(Activity.start_time, Activity.id) > after)
 
-        if not include_past:
-            query = query.filter(Activity.start_time >= datetime.now())
-
-        # Load related data
+        # Load related data for the surviving activities only
         query = query.options(
             joinedload(Activity.coach).load_only(
                 User.first_name, User.last_name, User.email, User.phone
             ),
-            joinedload(Activity.bookings)
-            .joinedload(ActivityBooking.user)
-            .load_only(User.first_name, User.last_name, User.email, User.phone),
         )
+        if include_attendees:
+            query = query.options(
+                selectinload(
+                    Activity.bookings.and_(
+                        ActivityBooking.booking_status == BookingStatus.CONFIRMED
+                    )
+                )
+                .joinedload(ActivityBooking.user)
+                .load_only(User.first_name, User.last_name, User.email, User.phone),
+            )
 
         # Execute query
-        activities = query.order_by(Activity.start_time).all()
+        query = query.order_by(Activity.start_time, Activity.id)
+        if limit is not None:
+            query = query.limit(limit)
+        rows = query.all()
 
         # Process results
         result = []
-        for activity in activities:
-            # Calculate available spots
-            booked_count = len(
-                [b for b in activity.bookings if b.booking_status == "confirmed"]
-            )
-            available_spots = activity.max_capacity - booked_count
-
-            # Skip if not enough available spots
-            if (
-                min_available_spots is not None
-                and available_spots < min_available_spots
-            ):
-                continue
-
+        for activity in rows:
             # Prepare attendee information
-            attendees = [
-                {
-                    "id": booking.user.id,
-                    "first_name": booking.user.first_name,
-                    "last_name": booking.user.last_name,
-                    "email": booking.user.email,
-                    "phone": booking.user.phone_number,
-                }
-                for booking in activity.bookings
-            ]
+            attendees = None
+            if include_attendees:
+                attendees = [
+                    {
+                        "id": booking.user.id,
+                        "first_name": booking.user.first_name,
+                        "last_name": booking.user.last_name,
+                        "email": booking.user.email,
+                        "phone": booking.user.phone,
+                    }
+                    for booking in activity.bookings
+                    # Past bookings of deleted members have no user
+                    if booking.user is not None
+                ]
 
+            coach = activity.coach
             result.append(
                 {
                     "id": activity.id,
@@ -98,14 +262,16 @@ class ActivityCRUDRepository(CRUDRepository):
                     "description": activity.description,
                     "duration": activity.duration,
                     "coach_id": activity.coach_id,
-                    "coach_first_name": activity.coach.first_name,
-                    "coach_last_name": activity.coach.last_name,
+                    # The coach is gone once their account was deleted
+                    "coach_first_name": coach.first_name if coach else "",
+                    "coach_last_name": coach.last_name if coach else "",
                     "start_time": activity.start_time,
                     "credits_required": activity.credits_required,
                     "max_capacity": activity.max_capacity,
-                    "spots_left": available_spots,
+                    "spots_left": activity.max_capacity - activity.confirmed_count,
                     "attendees": attendees,
-                    "attendee_count": booked_count,
+                    "attendee_count": activity.confirmed_count,
+                    "waitlist_count": activity.waitlist_count,
                 }
             )
 
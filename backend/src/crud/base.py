@@ -1,12 +1,81 @@
-from typing import List, Optional, Type, TypeVar
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from src.core.security import pwd_context
+from sqlalchemy import RowMapping, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+from src.core.security import (
+    aget_password_hash,
+    get_password_hash,
+    get_password_hashes,
+)
 
 ORMModel = TypeVar("ORMModel")
 
 
+class BatchLoader:
+    """Request-scoped loader that coalesces lookups by id into one query.
+
+    Ids queued with `queue` (or requested through `load_many`) are fetched
+    together with a single `IN (...)` query the first time any of them is
+    loaded. Results, including misses, are remembered for the lifetime of the
+    loader, so each id is queried at most once per request.
+
+    Get one through `CRUDRepository.loader(db)`, which keeps it on the session
+    so every caller within the same request shares it.
+    """
+
+    def __init__(self, repository: "CRUDRepository", db: Session) -> None:
+        self._repository = repository
+        self._db = db
+        self._cache: Dict[int, Optional[ORMModel]] = {}
+        self._pending: Set[int] = set()
+
+    def queue(self, ids: Iterable[int]) -> None:
+        """Announce ids that will be loaded, without querying yet."""
+        self._pending.update(i for i in ids if i not in self._cache)
+
+    def load(self, id: int) -> Optional[ORMModel]:
+        """Return the record with this id, or None if there is none."""
+        if id not in self._cache:
+            self._pending.add(id)
+            self._dispatch()
+        return self._cache[id]
+
+    def load_many(self, ids: Iterable[int]) -> List[Optional[ORMModel]]:
+        """Return the records for these ids, in order, None for missing ones."""
+        ids = list(ids)
+        self.queue(ids)
+        self._dispatch()
+        return [self._cache[i] for i in ids]
+
+    def clear(self, id: Optional[int] = None) -> None:
+        """Forget one id, or everything, e.g. after the records changed."""
+        if id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(id, None)
+
+    def _dispatch(self) -> None:
+        if not self._pending:
+            return
+        found = self._repository.get_many_by_ids(self._db, self._pending)
+        for id in self._pending:
+            self._cache[id] = found.get(id)
+        self._pending.clear()
+
+
 class CRUDRepository:
     """Base interface for CRUD operations."""
 
@@ -24,7 +93,67 @@ class CRUDRepository:
         return db.query(self._model).filter(*args).filter_by(**kwargs).first()
 
     def get_many(self, db: Session, *args, **kwargs) -> List[Optional[ORMModel]]:
-        return db.query(self._model).filter(*args).filter_by(**kwargs).all()
+        return self._list_query(db).filter(*args).filter_by(**kwargs).all()
+
+    def _list_query(self, db: Session) -> Query:
+        """The query that methods returning many records start from.
+
+        Repositories override this to choose loader strategies for the
+        relationships of their model.
+        """
+        return db.query(self._model)
+
+    def get_many_by_ids(self, db: Session, ids: Iterable[int]) -> Dict[int, ORMModel]:
+        """Fetch the records with these ids in a single query.
+
+        Returns:
+            The records found, keyed by id; missing ids are absent.
+        """
+        ids = set(ids)
+        if not ids:
+            return {}
+        records = self._list_query(db).filter(self._model.id.in_(ids)).all()
+        return {record.id: record for record in records}
+
+    def loader(self, db: Session) -> BatchLoader:
+        """The batching loader of this repository for the session's request."""
+        loaders = db.info.setdefault("batch_loaders", {})
+        if self._name not in loaders:
+            loaders[self._name] = BatchLoader(self, db)
+        return loaders[self._name]
+
+    def _changed(self, db: Union[Session, AsyncSession], ids: Set[int]) -> None:
+        """Called after a write to the records with these ids has committed.
+
+        Every write method, sync or async, calls it with the session it
+        committed on. Repositories override it to drop cached data built from
+        their records; notes taken during the transaction can be passed along
+        in `db.info`.
+        """
+
+    def _updated(self, db: Session, rows: List[dict]) -> None:
+        """Called inside the transaction of an update, before it commits.
+
+        `rows` holds the id and the values written of each updated record;
+        they are already flushed. Repositories override it to check rules
+        that span columns or rows, or to make follow-up writes. Raising
+        rolls the update back.
+        """
+
+    def _commit(self, db: Session) -> None:
+        """Commit, keeping the session's objects loaded.
+
+        The flush already read every server-generated column back through
+        RETURNING (see `eager_defaults` on the models), so expiring the
+        objects would only cost a SELECT per object to reload what was just
+        written.
+        """
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.commit()
+        finally:
+            db.expire_on_commit = expire_on_commit
 
     def create(self, db: Session, obj_create: Type[BaseModel]) -> ORMModel:
         """Create a new record in the db.
@@ -38,13 +167,13 @@ class CRUDRepository:
         """
         obj_create_data = obj_create.model_dump(exclude_none=True, exclude_unset=True)
         if "password" in obj_create_data.keys():
-            obj_create_data["hashed_password"] = pwd_context.hash(
+            obj_create_data["hashed_password"] = get_password_hash(
                 obj_create_data.pop("password")
             )
         db_obj = self._model(**obj_create_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        self._commit(db)
+        self._changed(db, {db_obj.id})
         return db_obj
 
     def update(
@@ -73,8 +202,14 @@ class CRUDRepository:
 
         # Add to session and commit
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        try:
+            db.flush()
+            self._updated(db, [{"id": db_obj.id, **obj_update_data}])
+        except Exception:
+            db.rollback()
+            raise
+        self._commit(db)
+        self._changed(db, {db_obj.id})
         return db_obj
 
     def delete(self, db: Session, db_obj: Type[BaseModel]) -> ORMModel:
@@ -87,6 +222,200 @@ class CRUDRepository:
         Returns:
             The deleted object.
         """
+        id = db_obj.id
         db.delete(db_obj)
         db.commit()
+        self._changed(db, {id})
+        return db_obj
+
+    def _bulk_rows(self, objs: Sequence[BaseModel], **dump_options) -> List[dict]:
+        """Dump pydantic models to column values, hashing any passwords."""
+        rows = [obj.model_dump(**dump_options) for obj in objs]
+        with_password = [row for row in rows if "password" in row]
+        hashes = get_password_hashes([row["password"] for row in with_password])
+        for row, hashed_password in zip(with_password, hashes):
+            del row["password"]
+            row["hashed_password"] = hashed_password
+        return rows
+
+    def _ordered(self, db: Session, ids: Sequence[int]) -> List[ORMModel]:
+        """Load the records with these ids in one query, in the given order."""
+        found = self.get_many_by_ids(db, ids)
+        return [found[id] for id in ids if id in found]
+
+    def bulk_create(
+        self, db: Session, objs_create: Sequence[BaseModel]
+    ) -> List[ORMModel]:
+        """Create many records in a single transaction.
+
+        The rows are sent as one multi-row INSERT ... RETURNING (split into
+        batches by the driver) that also returns the new records, instead of
+        an INSERT, commit and refresh per record.
+
+        Args:
+            db: The db session.
+            objs_create: The data for the new records (Pydantic models).
+
+        Returns:
+            The newly created records, in the order given.
+
+        Raises:
+            IntegrityError: If any row violates a constraint. Nothing is created.
+        """
+        rows = self._bulk_rows(objs_create, exclude_none=True, exclude_unset=True)
+        if not rows:
+            return []
+        try:
+            records = db.scalars(
+                insert(self._model).returning(
+                    self._model, sort_by_parameter_order=True
+                ),
+                rows,
+            ).all()
+            self._commit(db)
+        except Exception:
+            db.rollback()
+            raise
+        self._changed(db, {record.id for record in records})
+        return records
+
+    def bulk_update(
+        self, db: Session, objs_update: Sequence[BaseModel]
+    ) -> List[ORMModel]:
+        """Update many records, identified by their `id`, in a single transaction.
+
+        Only the fields set on each model are written, with one executemany
+        UPDATE per distinct set of fields.
+
+        Args:
+            db: The db session.
+            objs_update: The updated data, each including the record's id.
+
+        Returns:
+            The updated records, in the order given.
+
+        Raises:
+            StaleDataError: If any id does not exist. Nothing is updated.
+        """
+        rows = self._bulk_rows(objs_update, exclude_unset=True)
+        if not rows:
+            return []
+        try:
+            db.execute(update(self._model), rows)
+            self._updated(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        ids = [row["id"] for row in rows]
+        self._changed(db, set(ids))
+        return self._ordered(db, ids)
+
+    def bulk_delete(self, db: Session, ids: Iterable[int]) -> int:
+        """Delete the records with these ids with a single DELETE.
+
+        Args:
+            db: The db session.
+            ids: The ids of the records to delete. Missing ids are ignored.
+
+        Returns:
+            The number of records deleted.
+        """
+        ids = set(ids)
+        if not ids:
+            return 0
+        result = db.execute(delete(self._model).where(self._model.id.in_(ids)))
+        db.commit()
+        self._changed(db, ids)
+        return result.rowcount
+
+    def stream(
+        self, db: Session, *columns, batch_size: int = 1000
+    ) -> Iterator[Sequence[RowMapping]]:
+        """Iterate over every record in batches, ordered by id.
+
+        Rows are fetched through a server-side cursor `batch_size` at a time,
+        so memory stays flat however large the table is. Only plain column
+        values are loaded, no ORM objects.
+
+        Args:
+            db: The db session. Must stay open until iteration finishes.
+            columns: The columns to select. Defaults to all of the model's.
+            batch_size: Rows fetched per round trip.
+
+        Yields:
+            Lists of row mappings.
+        """
+        columns = columns or tuple(self._model.__table__.columns)
+        result = db.execute(
+            select(*columns)
+            .order_by(self._model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from result.mappings().partitions()
+
+    # Async variants, for use with `src.database.get_async_db`.
+
+    async def aget_one(self, db: AsyncSession, *args, **kwargs) -> Optional[ORMModel]:
+        stmt = select(self._model).filter(*args).filter_by(**kwargs).limit(1)
+        result = await db.execute(stmt)
+        return result.scalars().first()
+
+    async def aget_many(
+        self, db: AsyncSession, *args, **kwargs
+    ) -> List[Optional[ORMModel]]:
+        stmt = select(self._model).filter(*args).filter_by(**kwargs)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def acreate(self, db: AsyncSession, obj_create: Type[BaseModel]) -> ORMModel:
+        """Create a new record in the db without blocking the event loop.
+
+        Args:
+            db: The async db session.
+            obj_create: The data for creating the new record (Pydantic model).
+
+        Returns:
+            The newly created record.
+        """
+        obj_create_data = obj_create.model_dump(exclude_none=True, exclude_unset=True)
+        if "password" in obj_create_data.keys():
+            obj_create_data["hashed_password"] = await aget_password_hash(
+                obj_create_data.pop("password")
+            )
+        db_obj = self._model(**obj_create_data)
+        db.add(db_obj)
+        await db.commit()
+        self._changed(db, {db_obj.id})
+        return db_obj
+
+    async def aupdate(
+        self,
+        db: AsyncSession,
+        db_obj: ORMModel,
+        obj_update: Type[BaseModel],
+    ) -> ORMModel:
+        """Async version of `update`."""
+        obj_update_data = obj_update.model_dump()
+
+        for field, value in obj_update_data.items():
+            setattr(db_obj, field, value)
+
+        db.add(db_obj)
+        try:
+            await db.flush()
+            await db.run_sync(self._updated, [{"id": db_obj.id, **obj_update_data}])
+        except Exception:
+            await db.rollback()
+            raise
+        await db.commit()
+        self._changed(db, {db_obj.id})
+        return db_obj
+
+    async def adelete(self, db: AsyncSession, db_obj: Type[BaseModel]) -> ORMModel:
+        """Async version of `delete`."""
+        id = db_obj.id
+        await db.delete(db_obj)
+        await db.commit()
+        self._changed(db, {id})
         return db_obj
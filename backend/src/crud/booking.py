@@ -0,0 +1,472 @@
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Row, and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.core.cache import timetable_cache
+from src.crud.base import CRUDRepository
+from src.models.activity import (
+    ACTIVE_BOOKING_INDEX,
+    Activity,
+    ActivityBooking,
+    BookingStatus,
+)
+
+
+class BookingError(Exception):
+    """Base class for booking requests that cannot be fulfilled."""
+
+
+class ActivityNotFoundError(BookingError):
+    """The activity does not exist."""
+
+
+class ActivityStartedError(BookingError):
+    """The activity has already started and can no longer be booked."""
+
+
+class AlreadyBookedError(BookingError):
+    """The member already holds a confirmed or waitlisted booking."""
+
+
+class BookingNotFoundError(BookingError):
+    """The member holds no live booking for the activity."""
+
+
+class BookingUnavailableError(BookingError):
+    """Neither a spot nor a waitlist place could be taken for the activity."""
+
+
+class InvalidCapacityError(BookingError):
+    """The activity's capacity is missing or below its confirmed bookings."""
+
+
+# Attempts at taking a spot or waitlist place before giving up; each retry
+# follows a spot being freed between the two conditional UPDATEs
+MAX_BOOKING_ATTEMPTS = 3
+
+
+class BookingCRUDRepository(CRUDRepository):
+    def __init__(self):
+        super().__init__(ActivityBooking)
+
+    def _reserve_spot(self, db: Session, activity_id: int) -> Optional[int]:
+        """Atomically take one spot of an upcoming activity.
+
+        The capacity check and the increment are a single conditional UPDATE,
+        so concurrent bookers only contend on the activity row for the length
+        of their own transaction and can never push confirmed_count past
+        max_capacity.
+
+        Returns:
+            The credits required by the activity, or None if no spot was taken.
+        """
+        return db.execute(
+            update(Activity)
+            .where(
+                Activity.id == activity_id,
+                Activity.start_time > datetime.now(),
+                Activity.confirmed_count < Activity.max_capacity,
+            )
+            .values(confirmed_count=Activity.confirmed_count + 1)
+            .returning(Activity.credits_required)
+        ).scalar_one_or_none()
+
+    def _join_waitlist(self, db: Session, activity_id: int) -> Optional[int]:
+        """Atomically count one more waitlisted booking of a full activity.
+
+        Returns:
+            The credits required by the activity, or None if the activity is
+            not upcoming or has a free spot.
+        """
+        return db.execute(
+            update(Activity)
+            .where(
+                Activity.id == activity_id,
+                Activity.start_time > datetime.now(),
+                Activity.confirmed_count >= Activity.max_capacity,
+            )
+            .values(waitlist_count=Activity.waitlist_count + 1)
+            .returning(Activity.credits_required)
+        ).scalar_one_or_none()
+
+    def book(self, db: Session, activity_id: int, user_id: int) -> ActivityBooking:
+        """Book a member onto an activity, or waitlist them if it is full.
+
+        Args:
+            db: The db session
+            activity_id: The activity to book
+            user_id: The member booking the activity
+
+        Returns:
+            The committed booking, CONFIRMED or WAITLIST.
+
+        Raises:
+            ActivityNotFoundError: If the activity does not exist.
+            ActivityStartedError: If the activity has already started.
+            AlreadyBookedError: If the member already has a live booking.
+            BookingUnavailableError: If the activity has no capacity set, or
+                spots kept being freed and taken while booking.
+        """
+        for _ in range(MAX_BOOKING_ATTEMPTS):
+            credits_required = self._reserve_spot(db, activity_id)
+            if credits_required is not None:
+                booking_status = BookingStatus.CONFIRMED
+                break
+            credits_required = self._join_waitlist(db, activity_id)
+            if credits_required is not None:
+                booking_status = BookingStatus.WAITLIST
+                break
+            # Neither update matched: the activity is missing, has started or
+            # has no capacity, or a spot was freed in between and is worth
+            # another try
+            activity = (
+                db.query(Activity.start_time, Activity.max_capacity)
+                .filter(Activity.id == activity_id)
+                .first()
+            )
+            if activity is None:
+                raise ActivityNotFoundError(f"Activity {activity_id} not found")
+            if activity.start_time is None or activity.start_time <= datetime.now():
+                raise ActivityStartedError(f"Activity {activity_id} has started")
+            if activity.max_capacity is None:
+                raise BookingUnavailableError(
+                    f"Activity {activity_id} has no capacity set"
+                )
+        else:
+            raise BookingUnavailableError(
+                f"Could not book activity {activity_id}, please try again"
+            )
+
+        booking = ActivityBooking(
+            user_id=user_id,
+            activity_id=activity_id,
+            credits_used=credits_required,
+            booking_status=booking_status,
+        )
+        db.add(booking)
+        try:
+            # Rolling back also releases the reserved spot
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            constraint = getattr(getattr(e.orig, "diag", None), "constraint_name", None)
+            if constraint == ACTIVE_BOOKING_INDEX:
+                raise AlreadyBookedError(
+                    f"User {user_id} already booked activity {activity_id}"
+                ) from e
+            raise
+        timetable_cache.invalidate()
+        return booking
+
+    def cancel(self, db: Session, activity_id: int, user_id: int) -> ActivityBooking:
+        """Cancel a member's booking and hand a freed spot to the waitlist.
+
+        When a confirmed booking is cancelled, the oldest waitlisted booking of
+        the activity is promoted in the same transaction.
+
+        Args:
+            db: The db session
+            activity_id: The booked activity
+            user_id: The member cancelling
+
+        Returns:
+            The committed, cancelled booking.
+
+        Raises:
+            BookingNotFoundError: If the member has no live booking.
+        """
+        # Lock the activity before the booking, in the same order as book()
+        db.execute(
+            select(Activity.id).where(Activity.id == activity_id).with_for_update()
+        )
+        booking = (
+            db.query(ActivityBooking)
+            .filter(
+                ActivityBooking.activity_id == activity_id,
+                ActivityBooking.user_id == user_id,
+                ActivityBooking.booking_status != BookingStatus.CANCELLED,
+            )
+            .with_for_update()
+            .first()
+        )
+        if booking is None:
+            db.rollback()
+            raise BookingNotFoundError(
+                f"User {user_id} has no booking for activity {activity_id}"
+            )
+
+        was_confirmed = booking.booking_status == BookingStatus.CONFIRMED
+        booking.booking_status = BookingStatus.CANCELLED
+        if was_confirmed:
+            db.execute(
+                update(Activity)
+                .where(Activity.id == activity_id)
+                .values(confirmed_count=Activity.confirmed_count - 1)
+            )
+            self.promote_waitlist(db, [activity_id])
+        else:
+            db.execute(
+                update(Activity)
+                .where(Activity.id == activity_id)
+                .values(waitlist_count=Activity.waitlist_count - 1)
+            )
+        db.commit()
+        timetable_cache.invalidate()
+        return booking
+
+    def promote_waitlist(self, db: Session, activity_ids: Iterable[int]) -> List[int]:
+        """Promote the oldest waitlisted bookings into free spots.
+
+        Works on any number of activities at once: the free spots of all of
+        them are read in one locking query, and the waitlist positions are
+        ranked with a single window query over the (activity_id,
+        booking_status) index, so no activity's bookings are rescanned in full.
+        Does not commit; the caller owns the transaction.
+
+        Args:
+            db: The db session
+            activity_ids: The activities whose waitlists may have free spots
+
+        Returns:
+            The ids of the promoted bookings.
+        """
+        activities = db.execute(
+            select(
+                Activity.id,
+                Activity.max_capacity,
+                Activity.confirmed_count,
+                Activity.waitlist_count,
+            )
+            .where(
+                Activity.id.in_(set(activity_ids)),
+                Activity.start_time > datetime.now(),
+                Activity.confirmed_count < Activity.max_capacity,
+            )
+            .order_by(Activity.id)
+            .with_for_update()
+        ).all()
+        if not activities:
+            return []
+        free_spots = {a.id: a.max_capacity - a.confirmed_count for a in activities}
+
+        waitlist = (
+            select(
+                ActivityBooking.id,
+                ActivityBooking.activity_id,
+                func.row_number()
+                .over(
+                    partition_by=ActivityBooking.activity_id,
+                    order_by=ActivityBooking.id,
+                )
+                .label("position"),
+            )
+            .where(
+                ActivityBooking.activity_id.in_(free_spots),
+                ActivityBooking.booking_status == BookingStatus.WAITLIST,
+            )
+            .subquery()
+        )
+        candidates = db.execute(
+            select(waitlist).where(waitlist.c.position <= max(free_spots.values()))
+        ).all()
+        booking_ids = [
+            c.id for c in candidates if c.position <= free_spots[c.activity_id]
+        ]
+        if not booking_ids:
+            return []
+
+        # Re-checking the status skips bookings cancelled in the meantime
+        promoted = db.execute(
+            update(ActivityBooking)
+            .where(
+                ActivityBooking.id.in_(booking_ids),
+                ActivityBooking.booking_status == BookingStatus.WAITLIST,
+            )
+            .values(booking_status=BookingStatus.CONFIRMED)
+            .returning(ActivityBooking.id, ActivityBooking.activity_id)
+        ).all()
+        if not promoted:
+            return []
+        counts = {a.id: a for a in activities}
+        db.execute(
+            update(Activity),
+            [
+                {
+                    "id": activity_id,
+                    "confirmed_count": counts[activity_id].confirmed_count + n,
+                    "waitlist_count": counts[activity_id].waitlist_count - n,
+                }
+                for activity_id, n in Counter(p.activity_id for p in promoted).items()
+            ],
+        )
+        return [p.id for p in promoted]
+
+    def release_user_bookings(self, db: Session, user_ids: Iterable[int]) -> List[int]:
+        """Cancel the live bookings of members on upcoming activities.
+
+        Used when members are deleted, so their confirmed bookings stop
+        holding spots. The freed spots are offered to the waitlist. Bookings
+        of past activities are kept as history. Does not commit; the caller
+        owns the transaction.
+
+        Args:
+            db: The db session
+            user_ids: The members whose bookings to cancel
+
+        Returns:
+            The ids of the bookings promoted from the waitlist.
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return []
+        live = and_(
+            ActivityBooking.user_id.in_(user_ids),
+            ActivityBooking.booking_status != BookingStatus.CANCELLED,
+        )
+        # Lock the activities before the bookings, in the same order as book()
+        activities = db.execute(
+            select(Activity.id, Activity.confirmed_count, Activity.waitlist_count)
+            .where(
+                Activity.id.in_(select(ActivityBooking.activity_id).where(live)),
+                Activity.start_time > datetime.now(),
+            )
+            .order_by(Activity.id)
+            .with_for_update()
+        ).all()
+        if not activities:
+            return []
+        counts = {a.id: a for a in activities}
+        bookings = db.execute(
+            select(
+                ActivityBooking.id,
+                ActivityBooking.activity_id,
+                ActivityBooking.booking_status,
+            )
+            .where(live, ActivityBooking.activity_id.in_(counts))
+            .with_for_update()
+        ).all()
+        if not bookings:
+            return []
+
+        db.execute(
+            update(ActivityBooking)
+            .where(ActivityBooking.id.in_([b.id for b in bookings]))
+            .values(booking_status=BookingStatus.CANCELLED)
+        )
+        confirmed = Counter(
+            b.activity_id
+            for b in bookings
+            if b.booking_status == BookingStatus.CONFIRMED
+        )
+        waitlisted = Counter(
+            b.activity_id
+            for b in bookings
+            if b.booking_status == BookingStatus.WAITLIST
+        )
+        db.execute(
+            update(Activity),
+            [
+                {
+                    "id": activity_id,
+                    "confirmed_count": counts[activity_id].confirmed_count
+                    - confirmed[activity_id],
+                    "waitlist_count": counts[activity_id].waitlist_count
+                    - waitlisted[activity_id],
+                }
+                for activity_id in {b.activity_id for b in bookings}
+            ],
+        )
+        return self.promote_waitlist(db, confirmed)
+
+    def _booking_counts(self):
+        """Confirmed and waitlisted bookings per activity, counted from rows."""
+        status = ActivityBooking.booking_status
+        return select(
+            ActivityBooking.activity_id,
+            func.count().filter(status == BookingStatus.CONFIRMED).label("confirmed"),
+            func.count().filter(status == BookingStatus.WAITLIST).label("waitlist"),
+        ).group_by(ActivityBooking.activity_id)
+
+    def find_count_drift(self, db: Session) -> List[Row]:
+        """Find activities whose booking counters disagree with their bookings.
+
+        Returns:
+            Rows of (id, confirmed_count, waitlist_count, confirmed, waitlist),
+            the stored counters followed by the counts from the bookings.
+        """
+        counted = self._booking_counts().subquery()
+        confirmed = func.coalesce(counted.c.confirmed, 0)
+        waitlist = func.coalesce(counted.c.waitlist, 0)
+        return db.execute(
+            select(
+                Activity.id,
+                Activity.confirmed_count,
+                Activity.waitlist_count,
+                confirmed.label("confirmed"),
+                waitlist.label("waitlist"),
+            )
+            .outerjoin(counted, counted.c.activity_id == Activity.id)
+            .where(
+                or_(
+                    Activity.confirmed_count != confirmed,
+                    Activity.waitlist_count != waitlist,
+                )
+            )
+            .order_by(Activity.id)
+        ).all()
+
+    def reconcile_counts(self, db: Session, activity_ids: Iterable[int]) -> List[int]:
+        """Reset the booking counters of activities from their bookings.
+
+        The activities are locked first, so bookings and cancellations in
+        flight either finish before the recount or wait for it. Spots found
+        to be free are then offered to the waitlist. Commits.
+
+        Args:
+            db: The db session
+            activity_ids: The activities to repair
+
+        Returns:
+            The ids of the bookings promoted from the waitlist.
+        """
+        activity_ids = sorted(set(activity_ids))
+        if not activity_ids:
+            return []
+        db.execute(
+            select(Activity.id)
+            .where(Activity.id.in_(activity_ids))
+            .order_by(Activity.id)
+            .with_for_update()
+        )
+        counted = {
+            row.activity_id: row
+            for row in db.execute(
+                self._booking_counts().where(
+                    ActivityBooking.activity_id.in_(activity_ids)
+                )
+            )
+        }
+        db.execute(
+            update(Activity),
+            [
+                {
+                    "id": activity_id,
+                    "confirmed_count": getattr(
+                        counted.get(activity_id), "confirmed", 0
+                    ),
+                    "waitlist_count": getattr(counted.get(activity_id), "waitlist", 0),
+                }
+                for activity_id in activity_ids
+            ],
+        )
+        promoted = self.promote_waitlist(db, activity_ids)
+        db.commit()
+        timetable_cache.invalidate()
+        return promoted
+
+
+booking_crud = BookingCRUDRepository()
@@ -1,13 +1,79 @@
-from typing import List, Optional, Union
-
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from sqlalchemy import (
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, raiseload, selectinload
 
+from src.config import settings
+from src.core.cache import principal_cache, role_version_cache, timetable_cache
 from src.crud.base import CRUDRepository
-from src.models.user import Role, User, UserRole
+from src.crud.booking import booking_crud
+from src.models.activity import Activity, ActivityBooking
+from src.models.user import Role, RoleName, User, UserRole
+from src.schemas.user import UserPrincipal, UserResponse
+
+
+class RoleIdCache:
+    """Process-wide map of role names to role ids.
+
+    The role table holds one fixed row per RoleName, so the map is loaded
+    once, at startup, and only reloaded through `refresh` or when a valid
+    name is missing from it (e.g. roles seeded after startup).
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+
+    def refresh(self, db: Session) -> None:
+        """(Re)load the map from the role table."""
+        ids = {}
+        for role_id, name in db.execute(select(Role.id, Role.name).order_by(Role.id)):
+            ids.setdefault(name.value, role_id)
+        self._ids = ids
+
+    def get(self, db: Session, role_name: Union[str, RoleName]) -> Optional[int]:
+        """The id of the role with this name, or None if there is none."""
+        name = getattr(role_name, "value", role_name)
+        if name not in RoleName._value2member_map_:
+            return None
+        if name not in self._ids:
+            self.refresh(db)
+        return self._ids.get(name)
+
+    def clear(self) -> None:
+        self._ids = {}
+
+
+role_id_cache = RoleIdCache()
 
 
 class UserCRUDRepository(CRUDRepository):
+    def _list_query(self, db: Session, *eager_loads) -> Query:
+        """A User query with explicit loader strategies.
+
+        Relationships the caller needs are loaded up front with
+        `eager_loads`, e.g. selectinload(User.roles). With
+        RAISE_ON_LAZY_LOAD (set in the test suite) every other relationship
+        raises when touched, so a serializer that reaches for `roles`,
+        `activity_bookings` or `coached_activities` fails loudly instead of
+        issuing one query per user.
+        """
+        options = list(eager_loads)
+        if settings.RAISE_ON_LAZY_LOAD:
+            options.append(raiseload("*"))
+        return db.query(User).options(*options)
+
     def get_user_by_email(self, db: Session, email: str) -> Optional[User]:
         """Get a user by email.
 
@@ -20,6 +86,129 @@ class UserCRUDRepository(CRUDRepository):
         """
         return self.get_one(db, self._model.email == email)
 
+    def get_principal(self, db: Session, email: str) -> Optional[UserPrincipal]:
+        """Load a user and their role names as a cacheable principal.
+
+        Args:
+            db: The db session
+            email: The email (token subject) of the user
+
+        Returns:
+            The principal, or None if no user has this email.
+        """
+        user = (
+            db.query(User)
+            .options(selectinload(User.roles))
+            .filter(User.email == email)
+            .first()
+        )
+        if user is None:
+            return None
+        profile = UserResponse.model_validate(user, from_attributes=True)
+        return UserPrincipal(
+            **profile.model_dump(),
+            roles=[role.name.value for role in user.roles],
+            role_version=user.role_version,
+        )
+
+    def invalidate_principal(self, user_id: int) -> None:
+        """Drop any cached principal for this user."""
+        principal_cache.discard_where(lambda _, principal: principal.id == user_id)
+
+    def _bump_role_version(self, db: Session, user_id: int) -> int:
+        """Increment the user's role_version, invalidating issued role claims.
+
+        Must be called inside the transaction that changes the roles; call
+        `_roles_changed` once it has committed.
+
+        Returns:
+            The new role_version.
+        """
+        return db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(role_version=User.role_version + 1)
+            .returning(User.role_version)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+
+    def _roles_changed(self, user_id: int, role_version: int) -> None:
+        role_version_cache.set(user_id, role_version)
+        self.invalidate_principal(user_id)
+
+    def _note_coaches(self, db: Session, ids: Iterable[int]) -> None:
+        """Note in the session whether any of these users coaches an activity.
+
+        Listings show the coach of each activity, so `_changed` invalidates
+        the timetable after writes to coaches only; signups and edits of
+        other members leave it cached.
+        """
+        if db.scalar(select(exists().where(Activity.coach_id.in_(ids)))):
+            db.info["coaches_changed"] = True
+
+    def _updated(self, db: Session, rows: List[dict]) -> None:
+        ids = [row["id"] for row in rows if "first_name" in row or "last_name" in row]
+        if ids:
+            self._note_coaches(db, ids)
+
+    def _changed(self, db: Union[Session, AsyncSession], ids: Set[int]) -> None:
+        principal_cache.discard_where(lambda _, principal: principal.id in ids)
+        if db.info.pop("coaches_changed", False):
+            timetable_cache.invalidate()
+
+    def delete(self, db: Session, db_obj: User) -> User:
+        """Delete a user, cancelling their bookings of upcoming activities.
+
+        Their other bookings and coached activities are kept, detached.
+        """
+        self._note_coaches(db, [db_obj.id])
+        booking_crud.release_user_bookings(db, [db_obj.id])
+        return super().delete(db, db_obj)
+
+    def bulk_delete(self, db: Session, ids: Iterable[int]) -> int:
+        """Delete users, detaching their bookings and coached activities.
+
+        Live bookings of upcoming activities are cancelled first, handing
+        their spots to the waitlist, as on `delete`. Then, matching what the
+        ORM does on `delete`, role assignments are removed and references
+        from activities and bookings are set to NULL.
+        """
+        ids = set(ids)
+        if ids:
+            self._note_coaches(db, ids)
+            booking_crud.release_user_bookings(db, ids)
+            db.execute(delete(UserRole).where(UserRole.user_id.in_(ids)))
+            db.execute(
+                update(Activity)
+                .where(Activity.coach_id.in_(ids))
+                .values(coach_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(
+                update(ActivityBooking)
+                .where(ActivityBooking.user_id.in_(ids))
+                .values(user_id=None)
+                .execution_options(synchronize_session=False)
+            )
+        return super().bulk_delete(db, ids)
+
+    async def adelete(self, db: AsyncSession, db_obj: User) -> User:
+        """Async version of `delete`."""
+        await db.run_sync(self._note_coaches, [db_obj.id])
+        await db.run_sync(booking_crud.release_user_bookings, [db_obj.id])
+        return await super().adelete(db, db_obj)
+
+    async def aget_user_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
+        """Async version of `get_user_by_email`."""
+        return await self.aget_one(db, self._model.email == email)
+
+    async def aget_user_roles(self, db: AsyncSession, user_id: int) -> List[str]:
+        """Async version of `get_user_roles`."""
+        result = await db.execute(
+            select(Role.name).join(UserRole).where(UserRole.user_id == user_id)
+        )
+        return [name.value for name in result.scalars().all()]
+
     def add_role(self, db: Session, user_id: int, role_name: str) -> bool:
         """Add a role to a user.
 
@@ -33,23 +222,24 @@ class UserCRUDRepository(CRUDRepository):
             True if role added successfully, False otherwise.
         """
         try:
-            # Get role by name
-            role = db.query(Role).filter(Role.name == role_name).first()
-            if not role:
+            role_id = role_id_cache.get(db, role_name)
+            if role_id is None:
                 return False
 
             existing = (
                 db.query(UserRole)
-                .filter(UserRole.role_id == role.id, UserRole.user_id == user_id)
+                .filter(UserRole.role_id == role_id, UserRole.user_id == user_id)
                 .first()
             )
 
             if existing:
                 return False  # Role already assigned
 
-            user_role = UserRole(user_id=user_id, role_id=role.id)
+            user_role = UserRole(user_id=user_id, role_id=role_id)
             db.add(user_role)
+            role_version = self._bump_role_version(db, user_id)
             db.commit()
+            self._roles_changed(user_id, role_version)
             return True
 
         except IntegrityError:
@@ -68,15 +258,14 @@ class UserCRUDRepository(CRUDRepository):
             True if role was removed successfully, False otherwise
         """
         try:
-            # Get the role by name
-            role = db.query(Role).filter(Role.name == role_name).first()
-            if not role:
+            role_id = role_id_cache.get(db, role_name)
+            if role_id is None:
                 return False
 
             # Find and delete the user-role relationship
             user_role = (
                 db.query(UserRole)
-                .filter(UserRole.user_id == user_id, UserRole.role_id == role.id)
+                .filter(UserRole.user_id == user_id, UserRole.role_id == role_id)
                 .first()
             )
 
@@ -84,7 +273,9 @@ class UserCRUDRepository(CRUDRepository):
                 return False  # Role not assigned to user
 
             db.delete(user_role)
+            role_version = self._bump_role_version(db, user_id)
             db.commit()
+            self._roles_changed(user_id, role_version)
             return True
 
         except Exception:
@@ -117,37 +308,77 @@ class UserCRUDRepository(CRUDRepository):
         Returns:
             True if user has the role, False otherwise
         """
-        count = (
-            db.query(UserRole)
-            .join(Role)
-            .filter(UserRole.user_id == user_id, Role.name == role_name)
-            .count()
+        return db.scalar(
+            select(
+                exists().where(
+                    UserRole.user_id == user_id,
+                    UserRole.role_id == Role.id,
+                    Role.name == role_name,
+                )
+            )
+        )
+
+    def roles_for_users(
+        self, db: Session, user_ids: Iterable[int]
+    ) -> Dict[int, List[str]]:
+        """Get the role names of many users with a single query.
+
+        Args:
+            db: The database session
+            user_ids: IDs of the users
+
+        Returns:
+            Role names in RoleName order, keyed by user id; users without
+            roles map to [].
+        """
+        roles = {user_id: [] for user_id in user_ids}
+        if not roles:
+            return roles
+        rows = db.execute(
+            select(UserRole.user_id, Role.name)
+            .join(Role, UserRole.role_id == Role.id)
+            .where(UserRole.user_id.in_(roles))
+            .order_by(UserRole.user_id, Role.name)
         )
-        return count > 0
+        for user_id, name in rows:
+            roles[user_id].append(name.value)
+        return roles
 
     def set_roles(self, db: Session, user_id: int, role_names: List[str]) -> bool:
         """Set user's roles (replaces all existing roles).
 
+        Role ids come from `role_id_cache`, so this is one DELETE and one
+        multi-row INSERT however many roles are assigned, plus the
+        role_version bump.
+
         Args:
             db: The database session
             user_id: ID of the user
-            role_names: List of role names to assign
+            role_names: List of role names to assign; unknown names are skipped
 
         Returns:
             True if roles were set successfully, False otherwise
         """
         try:
+            role_ids = {role_id_cache.get(db, name) for name in role_names} - {None}
+
             # Remove all existing roles
-            db.query(UserRole).filter(UserRole.user_id == user_id).delete()
+            db.execute(delete(UserRole).where(UserRole.user_id == user_id))
 
             # Add new roles
-            for role_name in role_names:
-                role = db.query(Role).filter(Role.name == role_name).first()
-                if role:
-                    user_role = UserRole(user_id=user_id, role_id=role.id)
-                    db.add(user_role)
-
+            if role_ids:
+                db.execute(
+                    insert(UserRole).values(
+                        [
+                            {"user_id": user_id, "role_id": role_id}
+                            for role_id in sorted(role_ids)
+                        ]
+                    )
+                )
+
+            role_version = self._bump_role_version(db, user_id)
             db.commit()
+            self._roles_changed(user_id, role_version)
             return True
 
         except Exception:
@@ -165,12 +396,121 @@ class UserCRUDRepository(CRUDRepository):
             List of User objects with the specified role
         """
         return (
-            db.query(User)
+            self._list_query(db)
             .join(UserRole, User.id == UserRole.user_id)
             .join(Role, UserRole.role_id == Role.id)
             .filter(Role.name == role_name)
             .all()
         )
 
+    def get_directory(
+        self,
+        db: Session,
+        role_name: Optional[str] = None,
+        sort_by: str = "last_name",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        after: Optional[Tuple] = None,
+    ) -> List[User]:
+        """Get one page of users, ordered by a column, for the user directory.
+
+        Users are ordered by (sort_by, id) and paginated by keyset, so every
+        page is a range scan of the matching (column, id) index no matter how
+        deep into the directory it is.
+
+        Args:
+            db: The database session
+            role_name: Only users with this role
+            sort_by: The User column to order by
+            descending: Whether to order from the highest value down
+            limit: Maximum number of users to return
+            after: Keyset (sort_by value, id) of the last user already seen;
+                only users ordered after it are returned
+
+        Returns:
+            List of User objects
+        """
+        column = getattr(User, sort_by)
+        query = self._list_query(db)
+        if role_name is not None:
+            query = (
+                query.join(UserRole, User.id == UserRole.user_id)
+                .join(Role, UserRole.role_id == Role.id)
+                .filter(Role.name == role_name)
+            )
+        keyset = tuple_(column, User.id)
+        if after is not None:
+            query = query.filter(keyset < after if descending else keyset > after)
+        if descending:
+            query = query.order_by(column.desc(), User.id.desc())
+        else:
+            query = query.order_by(column, User.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def search(self, db: Session, query: str, limit: int = 20) -> List[User]:
+        """Find members by partial name, email or phone number.
+
+        A query without letters is matched as a phone number: its digits are
+        looked up anywhere in the digits-only `phone`, so punctuation, a
+        missing country code or just the last digits all match. Otherwise
+        every word of the query must appear in the first name, last name or
+        email. The substring filters are served by the pg_trgm indexes.
+        Prefix matches rank first.
+
+        Args:
+            db: The database session
+            query: What the user typed
+            limit: Maximum number of users to return
+
+        Returns:
+            List of User objects, best matches first
+        """
+        digits = "".join(c for c in query if c.isdigit())
+        if digits and not any(c.isalpha() for c in query):
+            filters = [User.phone.like(f"%{digits}%")]
+            prefix = User.phone.like(f"{digits}%")
+        else:
+            words = [_escape_like(word) for word in query.split()]
+            if not words:
+                return []
+            columns = (User.first_name, User.last_name, User.email)
+            filters = [
+                or_(*(column.ilike(f"%{word}%") for column in columns))
+                for word in words
+            ]
+            prefix = or_(*(column.ilike(f"{words[0]}%") for column in columns))
+        return (
+            self._list_query(db)
+            .filter(*filters)
+            .order_by(case((prefix, 0), else_=1), User.last_name, User.id)
+            .limit(limit)
+            .all()
+        )
+
+    def get_role_listing_version(self, db: Session, role_name: str) -> Tuple:
+        """Cheap version of `get_users_by_role`, for ETags.
+
+        Role changes bump role_version and with it updated_at, so the count
+        and latest update change whenever a user gains, loses or edits the
+        role's membership.
+
+        Returns:
+            (count, latest updated_at) of the users with the role.
+        """
+        return tuple(
+            db.query(func.count(User.id), func.max(User.updated_at))
+            .join(UserRole, User.id == UserRole.user_id)
+            .join(Role, UserRole.role_id == Role.id)
+            .filter(Role.name == role_name)
+            .one()
+        )
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards in user input (backslash is Postgres' default)."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 
 user_crud = UserCRUDRepository(User)
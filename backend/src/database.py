@@ -1,17 +1,191 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional
 
-from src.config import settings
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from src.config import Environment, settings
+
+
+class PoolWaitMetrics:
+    """Thread-safe counters for how long requests wait for a pooled connection."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(
+                    self.total_wait_seconds / (self.checkouts or 1) * 1000, 2
+                ),
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            }
+
+
+class _WaitTimingMixin:
+    """Times every checkout from the pool, including timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_metrics = PoolWaitMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Pool) -> dict:
+    """Report the occupancy and checkout wait times of a connection pool."""
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    # Every pool of the app is built with DB_MAX_OVERFLOW; a negative value
+    # means overflow is unlimited, so the pool never runs out
+    max_overflow = settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "exhausted": max_overflow >= 0 and checked_out >= pool.size() + max_overflow,
+    }
+    if isinstance(pool, _WaitTimingMixin):
+        status.update(pool.wait_metrics.snapshot())
+    return status
+
+
+class ReplicaRouter:
+    """Round-robin over read replica engines, skipping ones that recently failed.
+
+    A replica that cannot hand out a connection is skipped for `retry_after`
+    seconds, after which it is tried again.
+    """
+
+    def __init__(
+        self,
+        engines: List[Engine],
+        retry_after: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.engines = engines
+        self.retry_after = retry_after
+        self._timer = timer
+        self._counter = itertools.count()
+        self._unhealthy_until: dict = {}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List[Engine]:
+        """Healthy replicas, starting with the next one in the rotation."""
+        if not self.engines:
+            return []
+        start = next(self._counter) % len(self.engines)
+        ordered = self.engines[start:] + self.engines[:start]
+        now = self._timer()
+        with self._lock:
+            return [e for e in ordered if self._unhealthy_until.get(e, 0) <= now]
+
+    def mark_unhealthy(self, engine: Engine) -> None:
+        with self._lock:
+            self._unhealthy_until[engine] = self._timer() + self.retry_after
+
+    def status(self) -> List[dict]:
+        now = self._timer()
+        with self._lock:
+            return [
+                {
+                    "host": e.url.host,
+                    "healthy": self._unhealthy_until.get(e, 0) <= now,
+                    **pool_status(e.pool),
+                }
+                for e in self.engines
+            ]
+
+
+pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
 
 engine = create_engine(
     settings.DATABASE_URL,
-    # pool_pre_ping=True,
-    # pool_recyle=3600,
+    poolclass=InstrumentedQueuePool,
     echo=settings.DEBUG,  # log queries in debug mode
+    **pool_options,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_router = ReplicaRouter(
+    [
+        create_engine(
+            url, poolclass=InstrumentedQueuePool, echo=settings.DEBUG, **pool_options
+        )
+        for url in settings.DATABASE_REPLICA_URLS
+    ],
+    retry_after=settings.REPLICA_RETRY_SECONDS,
+)
+
+if settings.ENVIRONMENT == Environment.TEST:
+    # The test client runs each request on its own event loop and asyncpg
+    # connections cannot be reused across loops, so don't pool them in tests.
+    async_pool_options = dict(poolclass=NullPool)
+else:
+    async_pool_options = dict(
+        poolclass=InstrumentedAsyncAdaptedQueuePool, **pool_options
+    )
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=settings.DEBUG,
+    **async_pool_options,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -25,3 +199,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def open_read_session(router: Optional[ReplicaRouter] = None) -> Session:
+    """Open a session on a healthy read replica, or on the primary if none is.
+
+    The connection is checked out up front so an unreachable replica is
+    detected here, marked unhealthy, and the next one tried.
+    """
+    router = router or replica_router
+    for replica in router.candidates():
+        db = SessionLocal(bind=replica)
+        try:
+            db.connection()
+            return db
+        except DBAPIError:
+            db.close()
+            router.mark_unhealthy(replica)
+    return SessionLocal()
+
+
+def get_read_db():
+    """
+    Database session dependency for read-only endpoints.
+    Routed to a read replica when any are configured, so it may lag the
+    primary slightly: endpoints that read their own writes use `get_db`.
+    """
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    Async database session dependency for `async def` endpoints.
+    Queries are awaited, so the event loop keeps serving other requests
+    while this one waits on Postgres.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,13 +1,41 @@
-from fastapi import FastAPI, Request
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import SQLAlchemyError
 
+from src.api.routes.health import router as health_router
 from src.api.routes.user import router as user_router
 from src.api.routes.users import router as users_router
 from src.api.routes.auth import router as auth_router
 from src.api.routes.activity import router as activity_router
+from src.api.routes.export import router as export_router
+from src.core.security import PasswordHashingBusyError
+from src.crud.user import role_id_cache
+from src.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the role id cache; if the database is not reachable yet, it loads
+    # itself on first use instead
+    try:
+        with SessionLocal() as db:
+            role_id_cache.refresh(db)
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not preload role ids: {e}")
+    yield
+
 
 app = FastAPI(
-    title="GymDash", description="API for managing a gym database.", version="0.0.1"
+    title="GymDash",
+    description="API for managing a gym database.",
+    version="0.0.1",
+    lifespan=lifespan,
 )
 
 # CORS middleware to allow React frontend to make requests
@@ -24,6 +52,20 @@ app.include_router(user_router, prefix="/api/v1/user", tags=["user"])
 app.include_router(users_router, prefix="/api/v1/users", tags=["users"])
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["token"])
 app.include_router(activity_router, prefix="/api/v1/activity", tags=["activity"])
+app.include_router(export_router, prefix="/api/v1/export", tags=["export"])
+app.include_router(health_router, prefix="/health", tags=["health"])
+
+
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy_handler(
+    request: Request, exc: PasswordHashingBusyError
+):
+    """Shed load when the password hashing pool is saturated."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/health")
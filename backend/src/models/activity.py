@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Enum, ForeignKey, Text, Integer, DateTime
+from sqlalchemy import Column, Enum, ForeignKey, Index, Text, Integer, DateTime
+from sqlalchemy import func, text
 from sqlalchemy.orm import relationship
 
 from src.models.user import User
@@ -20,11 +21,28 @@ class Activity(Base):
     # required_credit_type_id = Column(Integer) # TODO: add foreign key
     credits_required = Column(Integer)
     max_capacity = Column(Integer)
+    # Confirmed and waitlisted bookings, maintained by the booking engine so
+    # capacity can be reserved with a single conditional UPDATE and listings
+    # read one integer per activity. See scripts/reconcile_booking_counts.py
+    confirmed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    waitlist_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     # recurring? TODO
     bookings = relationship(
         "ActivityBooking", back_populates="activity", cascade="all, delete-orphan"
     )
 
+    # Fetch server-generated columns with RETURNING as part of each write
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        # Timetable listing: range on start_time, ordered/paginated by (start_time, id)
+        Index("ix_activity_start_time_id", "start_time", "id"),
+        # Per-coach listing
+        Index("ix_activity_coach_id_start_time", "coach_id", "start_time"),
+    )
+
 
 class BookingStatus(str, PyEnum):
     CONFIRMED = "confirmed"
@@ -32,6 +50,9 @@ class BookingStatus(str, PyEnum):
     WAITLIST = "waitlist"
 
 
+ACTIVE_BOOKING_INDEX = "uq_activity_booking_active_user"
+
+
 class ActivityBooking(Base):
     __tablename__ = "activity_booking"
 
@@ -42,3 +63,20 @@ class ActivityBooking(Base):
     user = relationship("User", back_populates="activity_bookings")
     credits_used = Column(Integer)
     booking_status = Column(Enum(BookingStatus, name="activity_booking_status"))
+
+    __table_args__ = (
+        # Bookings of an activity, by status
+        Index(
+            "ix_activity_booking_activity_id_status", "activity_id", "booking_status"
+        ),
+        # A member's bookings
+        Index("ix_activity_booking_user_id", "user_id"),
+        # At most one live (confirmed or waitlisted) booking per member and activity
+        Index(
+            ACTIVE_BOOKING_INDEX,
+            "activity_id",
+            "user_id",
+            unique=True,
+            postgresql_where=text("booking_status != 'CANCELLED'"),
+        ),
+    )
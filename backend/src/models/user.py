@@ -1,6 +1,15 @@
 from enum import Enum as PyEnum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, func
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from src.database import Base
@@ -17,11 +26,25 @@ class User(Base):
     phone = Column(String)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Bumped on every role change; tokens carrying an older value are stale
+    role_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     roles = relationship("Role", secondary="user_role", back_populates="users")
     coached_activities = relationship("Activity", back_populates="coach")
     activity_bookings = relationship("ActivityBooking", back_populates="user")
 
+    __table_args__ = (
+        # Keysets of the user directory, one per sort order (email is unique)
+        Index("ix_user_last_name_id", "last_name", "id"),
+        Index("ix_user_first_name_id", "first_name", "id"),
+        Index("ix_user_created_at_id", "created_at", "id"),
+        # Member search also relies on pg_trgm GIN indexes on first_name,
+        # last_name, email and phone, created by migration b7e2d94c1f58
+        # since they need the extension
+    )
+    # Fetch server-generated columns with RETURNING as part of each write
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class RoleName(str, PyEnum):
     CLIENT = "client"
@@ -43,3 +66,8 @@ class UserRole(Base):
 
     user_id = Column(Integer, ForeignKey("user.id"), primary_key=True)
     role_id = Column(Integer, ForeignKey("role.id"), primary_key=True)
+
+    __table_args__ = (
+        # The primary key leads with user_id; this serves users-by-role lookups
+        Index("ix_user_role_role_id_user_id", "role_id", "user_id"),
+    )
@@ -1,8 +1,9 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, EmailStr
-from pydantic_extra_types.phone_numbers import PhoneNumber
+from pydantic import BaseModel, EmailStr, field_validator
+
+from src.models.activity import BookingStatus
 
 
 class ActivityBase(BaseModel):
@@ -15,18 +16,58 @@ class ActivityBase(BaseModel):
     max_capacity: int
 
 
+class ActivityUpdate(BaseModel):
+    """A partial update of one activity; only the fields sent are changed."""
+
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    coach_id: Optional[int] = None
+    start_time: Optional[datetime] = None
+    duration: Optional[int] = None
+    credits_required: Optional[int] = None
+    max_capacity: Optional[int] = None
+
+    @field_validator("*")
+    @classmethod
+    def reject_null(cls, v):
+        # Fields may be left out, but an explicit null would be written
+        if v is None:
+            raise ValueError("May be omitted but not null")
+        return v
+
+
 class AttendeeInfo(BaseModel):
     id: int
     first_name: str
     last_name: str
     email: EmailStr
-    phone: PhoneNumber
+    phone: str  # Stored as digits only, see UserBase.validate_phone_number
 
 
 class ActivityResponse(ActivityBase):
     id: int
-    attendees: List[AttendeeInfo]
+    coach_id: Optional[int]  # None once the coach's account was deleted
+    # Only populated when the listing is requested with include=attendees
+    attendees: Optional[List[AttendeeInfo]] = None
     coach_first_name: str
     coach_last_name: str
     attendee_count: int
     spots_left: int
+    waitlist_count: int = 0
+
+
+class ActivityPage(BaseModel):
+    items: List[ActivityResponse]
+    next_cursor: Optional[str] = None
+
+
+class BookingResponse(BaseModel):
+    id: int
+    activity_id: int
+    user_id: int
+    credits_used: int
+    booking_status: BookingStatus
+
+    class Config:
+        from_attributes = True
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -12,7 +14,10 @@ class TokenData(BaseModel):
     """Token data schema."""
 
     email: EmailStr | None = None
+    user_id: int | None = None
     scopes: list[str] = []
+    role_version: int | None = None
+    issued_at: datetime | None = None
 
 
 class UserLogin(BaseModel):
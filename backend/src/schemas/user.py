@@ -1,6 +1,7 @@
 import re
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, field_validator, field_serializer
 from pydantic_extra_types.phone_numbers import PhoneNumber
@@ -67,6 +68,45 @@ class UserResponse(UserBase):
         from_attributes = True  # Enables ORM mode (formerly orm_mode = True)
 
 
+class UserWithRoles(UserResponse):
+    roles: List[str]
+
+
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+
+class UserWithRolesPage(BaseModel):
+    items: List[UserWithRoles]
+    next_cursor: Optional[str] = None
+
+
+class UserSortField(str, Enum):
+    """Columns the user directory can be ordered by."""
+
+    LAST_NAME = "last_name"
+    FIRST_NAME = "first_name"
+    EMAIL = "email"
+    CREATED_AT = "created_at"
+
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+class UserPrincipal(UserResponse):
+    """The authenticated user and their role names.
+
+    A detached snapshot rather than an ORM object, so it can be cached
+    across requests and sessions.
+    """
+
+    roles: List[str] = []
+    role_version: int = 0
+
+
 class UserUpdate(UserBase):
     id: int
     email: EmailStr  # Required
@@ -52,11 +52,7 @@ class ActivityFactory(BaseFactory):
     description = factory.Faker("paragraph")
     coach = None
     start_time = factory.Faker("date_time_this_year", after_now=True)
-    end_time = factory.LazyAttribute(
-        lambda o: factory.Faker(
-            "date_time_between", start_date=o.start_time, end_date="+2h"
-        ).evaluate(None, None, {"locale": "en"})
-    )
+    duration = factory.Faker("random_int", min=30, max=120)
     credits_required = factory.Faker("random_int", min=1, max=3)
     max_capacity = factory.Faker("random_int", min=3, max=30)
 
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 
 from src.crud.activity import activity_crud
+from src.crud.booking import booking_crud
 from src.crud.user import user_crud
 from src.models.user import User
 from src.schemas.user import UserCreate
@@ -29,14 +30,13 @@ class ActivityFactory:
         """
         self.activities_created += 1
         start_time = datetime.now() + timedelta(hours=hour_offset, days=day_offset)
-        end_time = start_time + timedelta(hours=1)
 
         return ActivityBase(
             name="Test Activity" + str(self.activities_created),
             description="testing description...",
             coach_id=coach_id,
             start_time=start_time,
-            end_time=end_time,
+            duration=60,
             credits_required=1,
             max_capacity=10,
         )
@@ -120,3 +120,34 @@ def test_get_activities_by_coach(test_db: Session):
     assert len(activities) == 1
     print(activities[0])
     assert activities[0]["coach_id"] == coach_ids[0]
+
+
+def test_get_activities_min_available_spots(test_db: Session):
+    u_factory = UserFactory()
+    coach = user_crud.create(db=test_db, obj_create=u_factory.create_user())
+    members = [
+        user_crud.create(db=test_db, obj_create=u_factory.create_user())
+        for _ in range(3)
+    ]
+
+    a_factory = ActivityFactory()
+    full_activity = activity_crud.create(
+        test_db, a_factory.create_activity(hour_offset=1, coach_id=coach.id)
+    )
+    open_activity = activity_crud.create(
+        test_db, a_factory.create_activity(hour_offset=2, coach_id=coach.id)
+    )
+    full_activity.max_capacity = 2
+    test_db.commit()
+    for member in members:
+        booking_crud.book(test_db, full_activity.id, member.id)
+    booking_crud.cancel(test_db, full_activity.id, members[2].id)
+
+    activities = activity_crud.get_activities(db=test_db, min_available_spots=1)
+    assert [a["id"] for a in activities] == [open_activity.id]
+    assert activities[0]["spots_left"] == open_activity.max_capacity
+
+    activities = activity_crud.get_activities(db=test_db, min_available_spots=0)
+    full = next(a for a in activities if a["id"] == full_activity.id)
+    assert full["attendee_count"] == 2
+    assert full["spots_left"] == 0
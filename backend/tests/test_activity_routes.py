@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 
 from src.crud.activity import activity_crud
+from src.core.cache import timetable_cache
+from src.crud.booking import booking_crud
 from src.crud.user import user_crud
 from src.models.user import User
 from src.schemas.user import UserCreate
@@ -27,7 +29,330 @@ def test_filtered_route(test_db: Session, client):
         f"/api/v1/activity/filtered?coach_id={coach1.id}&include_past=True"
     )
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
 
     assert len(data) == num_coach1
     assert all(activity["coach_id"] == coach1.id for activity in data)
+
+
+def test_get_all_activities_keyset_pagination(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    start = datetime.now() + timedelta(days=1)
+    # Two activities share a start_time so the id tie-breaker is exercised
+    activities = [
+        ActivityFactory(coach=coach, start_time=start + timedelta(hours=h))
+        for h in (0, 0, 1, 2, 3)
+    ]
+    expected_ids = [
+        a.id for a in sorted(activities, key=lambda a: (a.start_time, a.id))
+    ]
+
+    seen_ids = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/activity/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen_ids.extend(a["id"] for a in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen_ids == expected_ids
+
+
+def test_get_all_activities_invalid_cursor(client):
+    response = client.get("/api/v1/activity/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_activity_listing_attendee_projection(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    member = UserFactory(phone="14155552671")
+    activity = ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1)
+    )
+    booking_crud.book(test_db, activity.id, member.id)
+
+    response = client.get("/api/v1/activity/")
+    assert response.status_code == 200
+    (summary,) = response.json()["items"]
+    assert summary["attendees"] is None
+    assert summary["attendee_count"] == 1
+    assert summary["spots_left"] == activity.max_capacity - 1
+
+    response = client.get("/api/v1/activity/", params={"include": "attendees"})
+    assert response.status_code == 200
+    (detailed,) = response.json()["items"]
+    assert [a["id"] for a in detailed["attendees"]] == [member.id]
+
+    response = client.get("/api/v1/activity/", params={"include": "bookings"})
+    assert response.status_code == 400
+
+
+def test_timetable_is_cached_until_bookings_change(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    member = UserFactory()
+    activity = ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1), max_capacity=5
+    )
+
+    before = client.get("/health/cache").json()["timetable"]
+    first = client.get("/api/v1/activity/")
+    assert first.json()["items"][0]["spots_left"] == 5
+    assert client.get("/api/v1/activity/").content == first.content
+    after = client.get("/health/cache").json()["timetable"]
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    # Writes that bypass the repositories are not seen
+    activity.max_capacity = 8
+    test_db.commit()
+    assert client.get("/api/v1/activity/").json()["items"][0]["spots_left"] == 5
+
+    # A booking invalidates every cached page
+    booking_crud.book(test_db, activity.id, member.id)
+    assert client.get("/api/v1/activity/").json()["items"][0]["spots_left"] == 7
+
+
+def test_creating_an_activity_invalidates_the_timetable(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    assert client.get("/api/v1/activity/").json()["items"] == []
+
+    activity_crud.create(
+        test_db,
+        ActivityBase(
+            name="Spin",
+            description="Indoor cycling",
+            coach_id=coach.id,
+            start_time=datetime.now() + timedelta(days=1),
+            duration=45,
+            credits_required=1,
+            max_capacity=10,
+        ),
+    )
+    assert len(client.get("/api/v1/activity/").json()["items"]) == 1
+
+
+def test_timetable_etag_answers_not_modified(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    member = UserFactory()
+    activity = ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1)
+    )
+
+    response = client.get("/api/v1/activity/")
+    etag = response.headers["ETag"]
+    response = client.get("/api/v1/activity/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Also without a cached page: only the version query runs
+    timetable_cache.clear()
+    response = client.get("/api/v1/activity/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # Other query parameters have their own version
+    response = client.get(
+        "/api/v1/activity/", params={"limit": 10}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    booking_crud.book(test_db, activity.id, member.id)
+    response = client.get("/api/v1/activity/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_attendee_etag_follows_attendee_edits(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    member = UserFactory()
+    activity = ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1)
+    )
+    booking_crud.book(test_db, activity.id, member.id)
+    params = {"include": "attendees"}
+
+    response = client.get("/api/v1/activity/", params=params)
+    etag = response.headers["ETag"]
+
+    # now() is fixed within the test's transaction, so set updated_at directly
+    member.first_name = "Renamed"
+    member.updated_at = member.updated_at + timedelta(seconds=1)
+    test_db.commit()
+    timetable_cache.clear()
+
+    response = client.get(
+        "/api/v1/activity/", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["items"][0]["attendees"][0]["first_name"] == "Renamed"
+
+    # Without the expansion attendee edits do not change the listing
+    etag = client.get("/api/v1/activity/").headers["ETag"]
+    member.first_name = "Again"
+    member.updated_at = member.updated_at + timedelta(seconds=1)
+    test_db.commit()
+    timetable_cache.clear()
+    response = client.get("/api/v1/activity/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_filtered_route_date_range_is_half_open(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    week_start = (datetime.now() + timedelta(days=7)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    inside = [
+        ActivityFactory(coach=coach, start_time=week_start),
+        ActivityFactory(
+            coach=coach, start_time=week_start + timedelta(days=6, hours=23)
+        ),
+    ]
+    # Starts exactly at the (exclusive) end of the range
+    ActivityFactory(coach=coach, start_time=week_start + timedelta(days=7))
+    ActivityFactory(coach=coach, start_time=week_start - timedelta(minutes=1))
+
+    params = {
+        "start_date": week_start.date().isoformat(),
+        "end_date": (week_start + timedelta(days=7)).date().isoformat(),
+    }
+    response = client.get("/api/v1/activity/filtered", params=params)
+    assert response.status_code == 200
+    assert [a["id"] for a in response.json()["items"]] == [a.id for a in inside]
+
+    params["end_date"] = params["start_date"]
+    response = client.get("/api/v1/activity/filtered", params=params)
+    assert response.status_code == 400
+
+
+def test_create_activity_route_returns_coach_name(test_db: Session, client):
+    coach = UserFactory(roles=[RoleFactory(name="coach")], first_name="Ada")
+    response = client.post(
+        "/api/v1/activity/create/",
+        json={
+            "name": "Yoga",
+            "description": "Vinyasa flow",
+            "coach_id": coach.id,
+            "start_time": (datetime.now() + timedelta(days=1)).isoformat(),
+            "duration": 60,
+            "credits_required": 1,
+            "max_capacity": 12,
+        },
+    )
+    assert response.status_code == 201
+    created = response.json()
+    assert created["coach_first_name"] == "Ada"
+    assert created["spots_left"] == 12
+
+
+def test_activity_batch_endpoints(
+    test_db: Session, client, sql_statements, auth_headers
+):
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    member = UserFactory()
+    headers = auth_headers(admin)
+    start = datetime.now() + timedelta(days=1)
+    payload = [
+        {
+            "name": f"Class {i}",
+            "description": "Imported",
+            "coach_id": coach.id,
+            "start_time": (start + timedelta(hours=i)).isoformat(),
+            "duration": 60,
+            "credits_required": 1,
+            "max_capacity": 10,
+        }
+        for i in range(20)
+    ]
+
+    del sql_statements[:]
+    response = client.post("/api/v1/activity/batch", json=payload, headers=headers)
+    assert response.status_code == 201
+    created = response.json()
+    assert [a["name"] for a in created] == [a["name"] for a in payload]
+    assert created[0]["coach_first_name"] == coach.first_name
+    # One INSERT for the whole batch, not one per activity
+    assert sum(s.startswith("INSERT INTO activity") for s in sql_statements) == 1
+
+    ids = [a["id"] for a in created]
+    response = client.patch(
+        "/api/v1/activity/batch",
+        json=[{"id": ids[0], "max_capacity": 5}, {"id": ids[1], "name": "Renamed"}],
+        headers=headers,
+    )
+    assert response.status_code == 200
+    first, second = response.json()
+    assert (first["max_capacity"], first["name"]) == (5, "Class 0")
+    assert (second["max_capacity"], second["name"]) == (10, "Renamed")
+
+    response = client.patch(
+        "/api/v1/activity/batch",
+        json=[{"id": ids[2], "name": "Lost"}, {"id": 0, "name": "Missing"}],
+        headers=headers,
+    )
+    assert response.status_code == 404
+    assert test_db.get(Activity, ids[2]).name == "Class 2"
+
+    booking_crud.book(test_db, ids[0], member.id)
+    response = client.post(
+        "/api/v1/activity/batch/delete", json={"ids": ids[:10]}, headers=headers
+    )
+    assert response.json() == {"deleted": 10}
+    assert test_db.query(Activity).filter(Activity.id.in_(ids)).count() == 10
+    assert test_db.query(ActivityBooking).count() == 0
+
+
+def test_activity_batch_update_keeps_capacity_consistent(
+    test_db: Session, client, auth_headers
+):
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    members = UserFactory.create_batch(3)
+    headers = auth_headers(admin)
+    activity = ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1), max_capacity=1
+    )
+    activity_id = activity.id
+    for member in members:
+        booking_crud.book(test_db, activity_id, member.id)
+
+    # Fields can be left out but not cleared
+    response = client.patch(
+        "/api/v1/activity/batch",
+        json=[{"id": activity_id, "max_capacity": None}],
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+    response = client.patch(
+        "/api/v1/activity/batch",
+        json=[{"id": activity_id, "max_capacity": 0}],
+        headers=headers,
+    )
+    assert response.status_code == 409
+    test_db.expire_all()
+    assert test_db.get(Activity, activity_id).max_capacity == 1
+
+    # Raising the capacity promotes the waitlist before anyone else books
+    response = client.patch(
+        "/api/v1/activity/batch",
+        json=[{"id": activity_id, "max_capacity": 5}],
+        headers=headers,
+    )
+    assert response.status_code == 200
+    (updated,) = response.json()
+    assert (updated["attendee_count"], updated["waitlist_count"]) == (3, 0)
+    assert updated["spots_left"] == 2
+
+
+def test_activity_batch_endpoints_require_admin(test_db: Session, client, auth_headers):
+    member = UserFactory()
+    headers = auth_headers(member)
+    response = client.post("/api/v1/activity/batch", json=[], headers=headers)
+    assert response.status_code == 403
@@ -0,0 +1,120 @@
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.core.cache import principal_cache
+from src.crud.user import user_crud
+from src.models.user import User
+from src.schemas.user import UserUpdate
+from tests.factories import RoleFactory, UserFactory
+
+
+def test_current_user_is_cached(client: TestClient, test_db: Session, auth_headers):
+    user = UserFactory(first_name="Before", phone="14155552671")
+    headers = auth_headers(user)
+
+    response = client.get("/api/v1/user/me", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["first_name"] == "Before"
+    assert principal_cache.get(user.email) is not None
+
+    # A write that bypasses the repository is not seen: the principal is cached
+    test_db.execute(update(User).where(User.id == user.id).values(first_name="Raw"))
+    test_db.commit()
+    response = client.get("/api/v1/user/me", headers=headers)
+    assert response.json()["first_name"] == "Before"
+
+    # Updating through the repository invalidates the cached principal
+    user_crud.update(
+        test_db,
+        user,
+        UserUpdate(
+            id=user.id,
+            email=user.email,
+            first_name="After",
+            last_name=user.last_name,
+            phone=user.phone,
+        ),
+    )
+    response = client.get("/api/v1/user/me", headers=headers)
+    assert response.json()["first_name"] == "After"
+
+
+def test_role_change_invalidates_cached_principal(
+    client: TestClient, test_db: Session, auth_headers
+):
+    user = UserFactory(roles=[RoleFactory(name="client")], phone="14155552671")
+    headers = auth_headers(user)
+
+    response = client.get("/api/v1/users/all", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    assert user_crud.add_role(test_db, user_id=user.id, role_name="admin")
+    response = client.get("/api/v1/users/all", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    assert user_crud.remove_role(test_db, user_id=user.id, role_name="admin")
+    response = client.get("/api/v1/users/all", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_admin_claims_are_trusted_until_roles_change(
+    client: TestClient, test_db: Session, auth_headers
+):
+    user = UserFactory(roles=[RoleFactory(name="client")], phone="14155552671")
+    headers = auth_headers(user, "admin")
+
+    # The signed claims are trusted on read endpoints without a db check
+    response = client.get("/api/v1/users/all", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert principal_cache.get(user.email) is None
+
+    # Changing roles bumps role_version, so the old token is rejected
+    assert user_crud.set_roles(test_db, user.id, ["client", "coach"])
+    response = client.get("/api/v1/users/all", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_stale_role_claims_fall_back_to_db(
+    client: TestClient, test_db: Session, monkeypatch, auth_headers
+):
+    user = UserFactory(roles=[RoleFactory(name="client")], phone="14155552671")
+    headers = auth_headers(user, "admin")
+    monkeypatch.setattr(settings, "ROLE_CLAIMS_MAX_AGE_MINUTES", -1)
+
+    response = client.get("/api/v1/users/all", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_outdated_role_version_is_rejected(
+    client: TestClient, test_db: Session, auth_headers
+):
+    user = UserFactory(roles=[RoleFactory(name="client")], phone="14155552671")
+    headers = auth_headers(user, "client")
+
+    response = client.get("/api/v1/user/me", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    assert user_crud.add_role(test_db, user_id=user.id, role_name="coach")
+    response = client.get("/api/v1/user/me", headers=headers)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_newer_role_version_reloads_cached_principal(
+    client: TestClient, test_db: Session, auth_headers
+):
+    user = UserFactory(roles=[RoleFactory(name="client")], phone="14155552671")
+    response = client.get("/api/v1/user/me", headers=auth_headers(user, "client"))
+    assert response.status_code == status.HTTP_200_OK
+    assert principal_cache.get(user.email).role_version == 0
+
+    # Roles changed through another process: this one still caches version 0
+    test_db.execute(update(User).where(User.id == user.id).values(role_version=1))
+    test_db.commit()
+    headers = auth_headers(user, "client", rv=1)
+
+    response = client.get("/api/v1/user/me", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert principal_cache.get(user.email).role_version == 1
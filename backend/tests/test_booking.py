@@ -0,0 +1,271 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.crud.booking import booking_crud
+from src.crud.user import user_crud
+from src.models.activity import Activity, ActivityBooking, BookingStatus
+from src.models.user import User
+from tests.conftest import TEST_SQLALCHEMY_DATABASE_URL
+from tests.factories import ActivityFactory, RoleFactory, UserFactory
+
+
+def upcoming_activity(**kwargs) -> Activity:
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    return ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1), **kwargs
+    )
+
+
+def test_book_activity_confirms_then_waitlists(
+    client: TestClient, test_db: Session, auth_headers
+):
+    activity = upcoming_activity(max_capacity=1, credits_required=2)
+    first, second = UserFactory(), UserFactory()
+
+    response = client.post(
+        f"/api/v1/activity/{activity.id}/book", headers=auth_headers(first)
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    booking = response.json()
+    assert booking["booking_status"] == BookingStatus.CONFIRMED.value
+    assert booking["user_id"] == first.id
+    assert booking["credits_used"] == 2
+
+    response = client.post(
+        f"/api/v1/activity/{activity.id}/book", headers=auth_headers(second)
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["booking_status"] == BookingStatus.WAITLIST.value
+
+    test_db.refresh(activity)
+    assert activity.confirmed_count == 1
+
+
+def test_book_activity_twice_conflicts(
+    client: TestClient, test_db: Session, auth_headers
+):
+    activity = upcoming_activity(max_capacity=5)
+    user = UserFactory()
+    url = f"/api/v1/activity/{activity.id}/book"
+
+    assert client.post(url, headers=auth_headers(user)).status_code == 201
+    response = client.post(url, headers=auth_headers(user))
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    # The rejected attempt released the spot it had reserved
+    test_db.refresh(activity)
+    assert activity.confirmed_count == 1
+
+
+def test_book_activity_rejects_missing_and_started(
+    client: TestClient, test_db: Session, auth_headers
+):
+    user = UserFactory()
+    started = upcoming_activity(max_capacity=5)
+    started.start_time = datetime.now() - timedelta(minutes=5)
+    test_db.commit()
+
+    response = client.post("/api/v1/activity/0/book", headers=auth_headers(user))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = client.post(
+        f"/api/v1/activity/{started.id}/book", headers=auth_headers(user)
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+def test_book_activity_without_capacity_conflicts(
+    client: TestClient, test_db: Session, auth_headers
+):
+    activity = upcoming_activity()
+    activity.max_capacity = None
+    test_db.commit()
+
+    # Neither a spot nor a waitlist place can ever be taken; no endless retry
+    response = client.post(
+        f"/api/v1/activity/{activity.id}/book", headers=auth_headers(UserFactory())
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+def test_book_activity_requires_authentication(client: TestClient, test_db: Session):
+    activity = upcoming_activity()
+    response = client.post(f"/api/v1/activity/{activity.id}/book")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_concurrent_bookings_never_oversell(db_engine):
+    """Bookers on separate connections race for the last spots."""
+    capacity, bookers = 3, 12
+    engine = create_engine(TEST_SQLALCHEMY_DATABASE_URL, pool_size=bookers)
+    SessionLocal = sessionmaker(bind=engine)
+
+    with SessionLocal() as db:
+        users = [
+            User(email=f"racer{i}@example.com", first_name="R", last_name=str(i))
+            for i in range(bookers + 1)
+        ]
+        db.add_all(users)
+        db.flush()
+        activity = Activity(
+            name="Popular class",
+            coach_id=users[-1].id,
+            start_time=datetime.now() + timedelta(days=1),
+            duration=60,
+            credits_required=1,
+            max_capacity=capacity,
+        )
+        db.add(activity)
+        db.commit()
+        activity_id = activity.id
+        user_ids = [user.id for user in users[:-1]]
+        all_user_ids = user_ids + [users[-1].id]
+
+    def book(user_id: int) -> BookingStatus:
+        with SessionLocal() as db:
+            return booking_crud.book(db, activity_id, user_id).booking_status
+
+    try:
+        with ThreadPoolExecutor(max_workers=bookers) as pool:
+            statuses = list(pool.map(book, user_ids))
+
+        assert statuses.count(BookingStatus.CONFIRMED) == capacity
+        assert statuses.count(BookingStatus.WAITLIST) == bookers - capacity
+        with SessionLocal() as db:
+            assert db.get(Activity, activity_id).confirmed_count == capacity
+    finally:
+        with SessionLocal() as db:
+            db.query(ActivityBooking).filter(
+                ActivityBooking.activity_id == activity_id
+            ).delete()
+            db.query(Activity).filter(Activity.id == activity_id).delete()
+            db.query(User).filter(User.id.in_(all_user_ids)).delete()
+            db.commit()
+        engine.dispose()
+
+
+def test_cancel_confirmed_booking_promotes_oldest_waitlisted(
+    client: TestClient, test_db: Session, auth_headers
+):
+    activity = upcoming_activity(max_capacity=1)
+    confirmed, first_waiting, second_waiting = UserFactory.create_batch(3)
+    url = f"/api/v1/activity/{activity.id}/book"
+    for user in (confirmed, first_waiting, second_waiting):
+        assert client.post(url, headers=auth_headers(user)).status_code == 201
+
+    response = client.delete(url, headers=auth_headers(confirmed))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["booking_status"] == BookingStatus.CANCELLED.value
+
+    statuses = dict(
+        test_db.query(ActivityBooking.user_id, ActivityBooking.booking_status)
+        .filter(ActivityBooking.activity_id == activity.id)
+        .all()
+    )
+    assert statuses[first_waiting.id] == BookingStatus.CONFIRMED
+    assert statuses[second_waiting.id] == BookingStatus.WAITLIST
+    test_db.refresh(activity)
+    assert activity.confirmed_count == 1
+
+    # Cancelling a waitlisted booking frees no spot
+    response = client.delete(url, headers=auth_headers(second_waiting))
+    assert response.json()["booking_status"] == BookingStatus.CANCELLED.value
+    test_db.refresh(activity)
+    assert activity.confirmed_count == 1
+
+    response = client.delete(url, headers=auth_headers(second_waiting))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_promote_waitlist_fills_free_spots_across_activities(test_db: Session):
+    activities = [upcoming_activity(max_capacity=2) for _ in range(2)]
+    users = UserFactory.create_batch(4)
+    for activity in activities:
+        for user in users:
+            booking_crud.book(test_db, activity.id, user.id)
+
+    # Free two spots on the first activity and one on the second
+    activities[0].max_capacity = 4
+    activities[1].max_capacity = 3
+    test_db.commit()
+
+    promoted = booking_crud.promote_waitlist(test_db, [a.id for a in activities])
+    test_db.commit()
+
+    assert len(promoted) == 3
+    for activity, expected in zip(activities, (4, 3)):
+        test_db.refresh(activity)
+        assert activity.confirmed_count == expected
+    # Waitlisted bookings are promoted in the order they were made
+    still_waiting = (
+        test_db.query(ActivityBooking.user_id)
+        .filter(
+            ActivityBooking.activity_id == activities[1].id,
+            ActivityBooking.booking_status == BookingStatus.WAITLIST,
+        )
+        .scalar()
+    )
+    assert still_waiting == users[3].id
+
+
+def test_waitlist_count_follows_bookings_and_cancellations(test_db: Session):
+    activity = upcoming_activity(max_capacity=1)
+    users = UserFactory.create_batch(3)
+    for user in users:
+        booking_crud.book(test_db, activity.id, user.id)
+    test_db.refresh(activity)
+    assert (activity.confirmed_count, activity.waitlist_count) == (1, 2)
+
+    booking_crud.cancel(test_db, activity.id, users[0].id)
+    test_db.refresh(activity)
+    assert (activity.confirmed_count, activity.waitlist_count) == (1, 1)
+
+    booking_crud.cancel(test_db, activity.id, users[2].id)
+    test_db.refresh(activity)
+    assert (activity.confirmed_count, activity.waitlist_count) == (1, 0)
+    assert booking_crud.find_count_drift(test_db) == []
+
+
+def test_deleting_a_member_hands_their_spot_to_the_waitlist(test_db: Session):
+    activity = upcoming_activity(max_capacity=1)
+    leaving, waiting = UserFactory(), UserFactory()
+    booking_crud.book(test_db, activity.id, leaving.id)
+    waitlisted = booking_crud.book(test_db, activity.id, waiting.id)
+
+    user_crud.delete(test_db, leaving)
+    test_db.refresh(activity)
+    test_db.refresh(waitlisted)
+    assert (activity.confirmed_count, activity.waitlist_count) == (1, 0)
+    assert waitlisted.booking_status == BookingStatus.CONFIRMED
+    assert booking_crud.find_count_drift(test_db) == []
+
+
+def test_reconcile_counts_repairs_drift(test_db: Session):
+    activity = upcoming_activity(max_capacity=2)
+    users = UserFactory.create_batch(3)
+    for user in users:
+        booking_crud.book(test_db, activity.id, user.id)
+
+    # A write that bypassed the booking engine
+    test_db.query(ActivityBooking).filter(
+        ActivityBooking.user_id == users[0].id
+    ).delete()
+    activity.waitlist_count = 5
+    test_db.commit()
+
+    (drift,) = booking_crud.find_count_drift(test_db)
+    assert drift.id == activity.id
+    assert (drift.confirmed_count, drift.confirmed) == (2, 1)
+    assert (drift.waitlist_count, drift.waitlist) == (5, 1)
+
+    # The freed spot goes to the waitlisted member
+    promoted = booking_crud.reconcile_counts(test_db, [drift.id])
+    assert len(promoted) == 1
+    test_db.refresh(activity)
+    assert (activity.confirmed_count, activity.waitlist_count) == (2, 0)
+    assert booking_crud.find_count_drift(test_db) == []
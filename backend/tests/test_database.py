@@ -0,0 +1,128 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.config import settings
+from src.database import (
+    InstrumentedQueuePool,
+    ReplicaRouter,
+    engine,
+    open_read_session,
+    pool_status,
+)
+from tests.conftest import TEST_SQLALCHEMY_DATABASE_URL
+
+
+def test_pool_status_reports_exhaustion_and_waits(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    engine = create_engine(
+        TEST_SQLALCHEMY_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        connection = engine.connect()
+        status = pool_status(engine.pool)
+        assert status["checked_out"] == 1
+        assert status["idle"] == 0
+        assert status["exhausted"] is True
+        assert status["checkouts"] == 1
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        assert pool_status(engine.pool)["timeouts"] == 1
+        assert pool_status(engine.pool)["max_wait_ms"] >= 50
+
+        connection.close()
+        status = pool_status(engine.pool)
+        assert status["checked_out"] == 0
+        assert status["idle"] == 1
+        assert status["exhausted"] is False
+    finally:
+        engine.dispose()
+
+
+def test_pool_status_unlimited_overflow_is_never_exhausted(db_engine, monkeypatch):
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", -1)
+    engine = create_engine(
+        TEST_SQLALCHEMY_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=-1,
+    )
+    try:
+        connections = [engine.connect() for _ in range(3)]
+        status = pool_status(engine.pool)
+        assert status["checked_out"] == 3
+        assert status["max_overflow"] == -1
+        assert status["exhausted"] is False
+        for connection in connections:
+            connection.close()
+    finally:
+        engine.dispose()
+
+
+def test_health_db_route(client: TestClient):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    primary = response.json()["primary"]
+    assert primary["pool"] == "InstrumentedQueuePool"
+    assert {"checked_out", "idle", "overflow", "avg_wait_ms"} <= primary.keys()
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def sqlite_engine(path):
+    return create_engine(f"sqlite:///{path}")
+
+
+def test_replica_router_round_robin(tmp_path):
+    replicas = [sqlite_engine(tmp_path / "a.db"), sqlite_engine(tmp_path / "b.db")]
+    router = ReplicaRouter(replicas, retry_after=30)
+
+    binds = []
+    for _ in range(4):
+        db = open_read_session(router)
+        binds.append(db.get_bind())
+        db.close()
+
+    assert binds == [replicas[0], replicas[1], replicas[0], replicas[1]]
+
+
+def test_replica_router_skips_unreachable_replica(tmp_path):
+    timer = FakeTimer()
+    broken = sqlite_engine(tmp_path / "missing" / "broken.db")
+    healthy = sqlite_engine(tmp_path / "healthy.db")
+    router = ReplicaRouter([broken, healthy], retry_after=30, timer=timer)
+
+    db = open_read_session(router)
+    assert db.get_bind() is healthy
+    db.close()
+    assert [r["healthy"] for r in router.status()] == [False, True]
+
+    # While it is marked unhealthy the broken replica is not retried
+    assert router.candidates() == [healthy]
+    timer.now += 31
+    assert broken in router.candidates()
+
+
+def test_read_session_falls_back_to_primary(tmp_path):
+    broken = sqlite_engine(tmp_path / "missing" / "broken.db")
+    router = ReplicaRouter([broken], retry_after=30)
+
+    db = open_read_session(router)
+    assert db.get_bind() is engine
+    db.close()
+
+    db = open_read_session(ReplicaRouter([], retry_after=30))
+    assert db.get_bind() is engine
+    db.close()
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.api.routes import export
+from src.crud.booking import booking_crud
+from tests.factories import ActivityFactory, RoleFactory, UserFactory
+
+
+def test_export_activities_ndjson_in_batches(
+    client: TestClient, test_db: Session, monkeypatch, auth_headers
+):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    activities = [
+        ActivityFactory(coach=coach, start_time=datetime.now() + timedelta(days=d))
+        for d in (-1, 1, 2)
+    ]
+
+    with client.stream(
+        "GET", "/api/v1/export/activities", headers=auth_headers(admin, "admin")
+    ) as response:
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert "attachment" in response.headers["content-disposition"]
+        lines = list(response.iter_lines())
+
+    rows = [json.loads(line) for line in lines if line]
+    # Past activities are part of the schedule export
+    assert [row["id"] for row in rows] == [a.id for a in activities]
+    assert rows[0]["start_time"] == activities[0].start_time.isoformat()
+    assert rows[0]["confirmed_count"] == 0
+
+
+def test_export_bookings_csv(client: TestClient, test_db: Session, auth_headers):
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    activity = ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1), max_capacity=1
+    )
+    members = UserFactory.create_batch(2)
+    for member in members:
+        booking_crud.book(test_db, activity.id, member.id)
+
+    response = client.get(
+        "/api/v1/export/bookings",
+        params={"format": "csv"},
+        headers=auth_headers(admin, "admin"),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(int(r["user_id"]), r["booking_status"]) for r in rows] == [
+        (members[0].id, "confirmed"),
+        (members[1].id, "waitlist"),
+    ]
+
+
+def test_export_empty_csv_has_header(
+    client: TestClient, test_db: Session, auth_headers
+):
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    response = client.get(
+        "/api/v1/export/bookings",
+        params={"format": "csv"},
+        headers=auth_headers(admin, "admin"),
+    )
+    assert response.text.strip() == "id,activity_id,user_id,credits_used,booking_status"
+
+
+def test_export_requires_admin(client: TestClient, test_db: Session, auth_headers):
+    member = UserFactory(roles=[RoleFactory(name="client")])
+    response = client.get("/api/v1/export/activities", headers=auth_headers(member))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from src.core.security import (
+    PasswordHasher,
+    PasswordHashingBusyError,
+    password_hasher,
+)
+
+
+def test_password_hasher_round_trip():
+    hasher = PasswordHasher(max_workers=2, max_pending=4)
+
+    hashed = hasher.hash("Str0ngP@ssword!")
+    assert hasher.verify("Str0ngP@ssword!", hashed)
+    assert not hasher.verify("wrong", hashed)
+
+    metrics = hasher.metrics.snapshot()
+    assert metrics["completed"] == 3
+    assert metrics["in_flight"] == 0
+    assert metrics["max_latency_ms"] > 0
+
+
+def test_password_hasher_rejects_when_queue_full():
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    blocked = hasher._submit(release.wait)
+    try:
+        with pytest.raises(PasswordHashingBusyError):
+            hasher.hash("Str0ngP@ssword!")
+    finally:
+        release.set()
+    blocked.result()
+
+    assert hasher.metrics.snapshot()["rejected"] == 1
+    # Capacity is freed once the blocking job completes
+    assert hasher.hash("Str0ngP@ssword!")
+
+
+def test_saturated_pool_returns_503(client: TestClient, monkeypatch):
+    monkeypatch.setattr(password_hasher, "_max_pending", 0)
+
+    user_data = {
+        "email": "busy@example.com",
+        "first_name": "Busy",
+        "last_name": "User",
+        "phone": "+14155552671",
+        "password": "Securepassword123!!",
+    }
+    response = client.post("/api/v1/user/", json=user_data)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+    response = client.get("/health/password-hashing")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["rejected"] >= 1
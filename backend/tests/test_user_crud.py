@@ -1,9 +1,17 @@
+from datetime import datetime, timedelta
+
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from src.crud.user import UserCRUDRepository
-from src.models.user import User
-from src.schemas.user import UserCreate, UserResponse
+from src.core.cache import principal_cache, timetable_cache
+from src.crud.activity import activity_crud
+from src.crud.user import UserCRUDRepository, role_id_cache
+from src.models.user import Role, RoleName, User
+from src.schemas.activity import ActivityBase
+from src.schemas.user import UserCreate, UserPrincipal, UserResponse, UserUpdate
+from tests.factories import ActivityFactory, RoleFactory, UserFactory
 
 
 @pytest.fixture
@@ -120,3 +128,279 @@ def test_role_methods(test_db: Session):
     # Check has_role functionality
     assert user_repo.has_role(test_db, my_user.id, "admin")
     assert not user_repo.has_role(test_db, my_user.id, "coach")
+
+
+@pytest.mark.anyio
+async def test_async_crud_methods(async_db: AsyncSession):
+    user_repo = UserCRUDRepository(User)
+
+    user_create = UserCreate(
+        email="async@example.com",
+        first_name="Async",
+        last_name="User",
+        phone="+12345678901",
+        password="Securepassword123$",
+    )
+    created_user = await user_repo.acreate(async_db, user_create)
+    assert created_user.id is not None
+    assert created_user.hashed_password != "Securepassword123$"
+
+    result = await user_repo.aget_user_by_email(async_db, "async@example.com")
+    assert result is not None
+    assert result.id == created_user.id
+    assert await user_repo.aget_user_by_email(async_db, "nobody@example.com") is None
+
+    users = await user_repo.aget_many(async_db, User.last_name == "User")
+    assert [u.id for u in users] == [created_user.id]
+
+    await user_repo.adelete(async_db, created_user)
+    assert await user_repo.aget_one(async_db, id=created_user.id) is None
+
+
+@pytest.mark.anyio
+async def test_async_writes_invalidate_caches(async_db: AsyncSession):
+    user_repo = UserCRUDRepository(User)
+    coach = await user_repo.acreate(
+        async_db,
+        UserCreate(
+            email="coach@example.com",
+            first_name="Async",
+            last_name="Coach",
+            phone="+12345678901",
+            password="Securepassword123$",
+        ),
+    )
+    principal = UserPrincipal(**UserResponse.model_validate(coach).model_dump())
+    principal_cache.set(coach.email, principal)
+
+    invalidations = timetable_cache.invalidations
+    await activity_crud.acreate(
+        async_db,
+        ActivityBase(
+            name="Spin",
+            description="Spin class",
+            coach_id=coach.id,
+            start_time=datetime.now() + timedelta(days=1),
+            duration=45,
+            credits_required=1,
+            max_capacity=10,
+        ),
+    )
+    assert timetable_cache.invalidations == invalidations + 1
+
+    # Renaming a coach changes listings and drops the cached principal
+    await user_repo.aupdate(
+        async_db,
+        coach,
+        UserUpdate(
+            id=coach.id,
+            email=coach.email,
+            first_name="Renamed",
+            last_name=coach.last_name,
+            phone=coach.phone,
+        ),
+    )
+    assert timetable_cache.invalidations == invalidations + 2
+    assert principal_cache.get(coach.email) is None
+
+
+def test_only_writes_to_coaches_invalidate_the_timetable(test_db: Session):
+    user_repo = UserCRUDRepository(User)
+    invalidations = timetable_cache.invalidations
+
+    # Signups and edits of members do not change any listing
+    member = user_repo.create(
+        test_db,
+        UserCreate(
+            email="member@example.com",
+            first_name="New",
+            last_name="Member",
+            phone="+12345678901",
+            password="Securepassword123$",
+        ),
+    )
+    assert timetable_cache.invalidations == invalidations
+    user_repo.update(
+        test_db,
+        member,
+        UserUpdate(
+            id=member.id,
+            email=member.email,
+            first_name="Renamed",
+            last_name=member.last_name,
+            phone=member.phone,
+        ),
+    )
+    assert timetable_cache.invalidations == invalidations
+
+    coach = UserFactory()
+    ActivityFactory(coach=coach)
+    invalidations = timetable_cache.invalidations
+    user_repo.update(
+        test_db,
+        coach,
+        UserUpdate(
+            id=coach.id,
+            email=coach.email,
+            first_name="Renamed",
+            last_name=coach.last_name,
+            phone=coach.phone,
+        ),
+    )
+    assert timetable_cache.invalidations == invalidations + 1
+
+    user_repo.delete(test_db, member)
+    assert timetable_cache.invalidations == invalidations + 1
+    user_repo.delete(test_db, coach)
+    assert timetable_cache.invalidations == invalidations + 2
+
+
+def test_batch_loader_coalesces_lookups(test_db: Session, sql_statements):
+    users = UserFactory.create_batch(3)
+    ids = [user.id for user in users]
+    user_repo = UserCRUDRepository(User)
+    test_db.expunge_all()
+
+    loader = user_repo.loader(test_db)
+    assert user_repo.loader(test_db) is loader
+
+    sql_statements.clear()
+    loader.queue(ids + [0])
+    loaded = [loader.load(id) for id in ids]
+    assert [user.id for user in loaded] == ids
+    assert loader.load(0) is None
+    assert loader.load_many(reversed(ids)) == list(reversed(loaded))
+    assert len(sql_statements) == 1
+    assert " IN " in sql_statements[0]
+
+    # Unknown ids trigger one more query; known ones are served from cache
+    assert loader.load_many([ids[0], -1]) == [loaded[0], None]
+    assert len(sql_statements) == 2
+
+
+def test_get_many_by_ids(test_db: Session):
+    users = UserFactory.create_batch(2)
+    found = UserCRUDRepository(User).get_many_by_ids(
+        test_db, [users[0].id, users[1].id, 0]
+    )
+    assert found == {users[0].id: users[0], users[1].id: users[1]}
+    assert UserCRUDRepository(User).get_many_by_ids(test_db, []) == {}
+
+
+def test_create_and_update_issue_one_statement_each(test_db: Session, sql_statements):
+    user_repo = UserCRUDRepository(User)
+
+    def writes():
+        # Savepoints stand in for the transaction the app would commit
+        return [s for s in sql_statements if "SAVEPOINT" not in s]
+
+    sql_statements.clear()
+    user = user_repo.create(
+        test_db,
+        UserCreate(
+            email="single@example.com",
+            first_name="One",
+            last_name="Trip",
+            phone="+12345678901",
+            password="Securepassword123$!",
+        ),
+    )
+    assert user.id is not None and user.created_at is not None
+    assert user.updated_at is not None and user.role_version == 0
+    assert len(writes()) == 1
+    assert writes()[0].startswith("INSERT") and "RETURNING" in writes()[0]
+
+    created_at = user.created_at
+    sql_statements.clear()
+    user = user_repo.update(
+        test_db,
+        user,
+        UserUpdate(
+            id=user.id,
+            email=user.email,
+            first_name="Two",
+            last_name=user.last_name,
+            phone=user.phone,
+        ),
+    )
+    assert (user.first_name, user.created_at) == ("Two", created_at)
+    assert user.updated_at is not None
+    # Plus the lookup of whether the renamed user coaches any activity
+    assert len(writes()) == 2
+    assert writes()[0].startswith("UPDATE") and "RETURNING" in writes()[0]
+    assert writes()[1].startswith("SELECT EXISTS")
+
+
+def test_set_roles_is_one_delete_and_one_insert(test_db: Session, sql_statements):
+    user_repo = UserCRUDRepository(User)
+    user_id = UserFactory().id
+    test_db.commit()
+    role_id_cache.refresh(test_db)
+
+    sql_statements.clear()
+    assert user_repo.set_roles(test_db, user_id, ["admin", "coach", "client"])
+    writes = [s for s in sql_statements if "SAVEPOINT" not in s]
+    assert [s.split()[0] for s in writes] == ["DELETE", "INSERT", "UPDATE"]
+    assert sorted(user_repo.get_user_roles(test_db, user_id)) == [
+        RoleName.ADMIN,
+        RoleName.CLIENT,
+        RoleName.COACH,
+    ]
+
+    # Unknown names are skipped without a lookup
+    sql_statements.clear()
+    assert user_repo.set_roles(test_db, user_id, ["client", "superuser"])
+    assert not any("FROM role" in s for s in sql_statements)
+    assert user_repo.get_user_roles(test_db, user_id) == [RoleName.CLIENT]
+
+
+def test_role_id_cache_reloads_missing_roles(test_db: Session):
+    role_id_cache.clear()
+    admin = test_db.query(Role).filter(Role.name == RoleName.ADMIN).one()
+    assert role_id_cache.get(test_db, "admin") == admin.id
+    assert role_id_cache.get(test_db, RoleName.ADMIN) == admin.id
+    assert role_id_cache.get(test_db, "superuser") is None
+
+
+def test_has_role_and_roles_for_users(test_db: Session, sql_statements):
+    user_repo = UserCRUDRepository(User)
+    admin, member, no_roles = UserFactory(), UserFactory(), UserFactory()
+    test_db.commit()
+    user_repo.set_roles(test_db, admin.id, ["admin", "coach"])
+    user_repo.set_roles(test_db, member.id, ["client"])
+    user_repo.set_roles(test_db, no_roles.id, [])
+
+    assert user_repo.has_role(test_db, admin.id, "admin") is True
+    assert user_repo.has_role(test_db, member.id, "admin") is False
+
+    ids = [admin.id, member.id, no_roles.id]
+    sql_statements.clear()
+    assert user_repo.roles_for_users(test_db, ids) == {
+        admin.id: ["coach", "admin"],
+        member.id: ["client"],
+        no_roles.id: [],
+    }
+    assert len(sql_statements) == 1
+    assert user_repo.roles_for_users(test_db, []) == {}
+
+
+def test_listed_users_raise_on_lazy_loads(test_db: Session):
+    user_repo = UserCRUDRepository(User)
+    coach_id = UserFactory(roles=[RoleFactory(name="coach")]).id
+    test_db.commit()
+    test_db.expunge_all()
+
+    (listed,) = user_repo.get_users_by_role(test_db, "coach")
+    assert listed.id == coach_id
+    for relationship in ("roles", "activity_bookings", "coached_activities"):
+        with pytest.raises(InvalidRequestError):
+            getattr(listed, relationship)
+
+    # Relationships loaded explicitly are available
+    test_db.expunge_all()
+    (listed,) = (
+        user_repo._list_query(test_db, selectinload(User.roles))
+        .filter(User.id == coach_id)
+        .all()
+    )
+    assert [role.name for role in listed.roles] == [RoleName.COACH]
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from src.main import app
 from src.models.user import User
 from src.schemas.user import UserCreate
-from src.core.security import verify_password
+from src.core.security import decode_token, verify_password
 
 client = TestClient(app)
 
@@ -79,6 +79,12 @@ def test_login_success(test_db: Session):
     assert "access_token" in data
     assert data["token_type"] == "bearer"
 
+    claims = decode_token(data["access_token"])
+    assert claims["sub"] == user_data["email"]
+    assert claims["scopes"] == []
+    assert claims["rv"] == 0
+    assert "uid" in claims and "iat" in claims
+
 
 def test_login_wrong_password(test_db: Session):
     """Test login with wrong password is rejected."""
@@ -1,12 +1,17 @@
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from src.core.security import verify_password
+from src.crud.booking import booking_crud
 from src.crud.user import user_crud
+from src.models.activity import ActivityBooking, BookingStatus
 from src.models.user import Role, RoleName, User, UserRole
 from src.schemas.user import UserCreate, UserResponse
-from tests.factories import UserFactory, RoleFactory
+from tests.factories import ActivityFactory, UserFactory, RoleFactory
 
 
 def test_create_user_success(client: TestClient, test_db: Session):
@@ -96,14 +101,17 @@ def test_create_user_invalid_data(client: TestClient, test_db: Session):
     assert "password" in error_fields
 
 
-def test_fetch_all_users_empty(client: TestClient, test_db: Session):
+def test_fetch_all_users_empty(client: TestClient, test_db: Session, auth_headers):
     """Test fetching all users when no users exist."""
-    response = client.get("/api/v1/users/all")
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    response = client.get(
+        "/api/v1/users/all", params={"role": "client"}, headers=auth_headers(admin)
+    )
     assert response.status_code == 200
-    assert response.json() == []
+    assert response.json() == {"items": [], "next_cursor": None}
 
 
-def test_fetch_all_users_with_data(client: TestClient, test_db: Session):
+def test_fetch_all_users_with_data(client: TestClient, test_db: Session, auth_headers):
     """Test fetching all users when users exist."""
     # Create test users
     user1 = UserCreate(
@@ -128,12 +136,15 @@ def test_fetch_all_users_with_data(client: TestClient, test_db: Session):
         test_db.commit()
 
         # Make request
-        response = client.get("/api/v1/users/all")
+        admin = UserFactory(
+            roles=[RoleFactory(name="admin")], email="admin@example.com"
+        )
+        response = client.get("/api/v1/users/all", headers=auth_headers(admin))
         assert response.status_code == 200
 
         # Verify response
-        users = response.json()
-        assert len(users) == 2
+        users = response.json()["items"]
+        assert len(users) == 3
         assert any(u["email"] == "user1@example.com" for u in users)
         assert any(u["email"] == "user2@example.com" for u in users)
     finally:
@@ -183,3 +194,204 @@ def test_get_coaches(client: TestClient, test_db: Session):
     assert response.status_code == 200
     data = response.json()
     assert len(data) == num_coaches
+
+
+def test_get_coaches_etag(client: TestClient, test_db: Session):
+    UserFactory(roles=[RoleFactory(name="coach")])
+    test_db.commit()
+
+    response = client.get("/api/v1/user/coaches/")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/v1/user/coaches/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    # A new coach changes the version
+    UserFactory(roles=[RoleFactory(name="coach")])
+    test_db.commit()
+    response = client.get("/api/v1/user/coaches/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
+
+
+def test_users_batch_endpoints(client: TestClient, test_db: Session, auth_headers):
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    headers = auth_headers(admin)
+    payload = [
+        {
+            "email": f"import{i}@example.com",
+            "first_name": "Imported",
+            "last_name": str(i),
+            "phone": f"555000{i:04d}",
+            "password": "Apassword123@",
+        }
+        for i in range(5)
+    ]
+
+    response = client.post("/api/v1/users/batch", json=payload, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    created = response.json()
+    assert [u["email"] for u in created] == [u["email"] for u in payload]
+    imported = user_crud.get_user_by_email(test_db, "import0@example.com")
+    assert verify_password("Apassword123@", imported.hashed_password)
+
+    # An email already taken rejects the whole batch
+    duplicate = [dict(payload[0], email="new@example.com"), payload[1]]
+    response = client.post("/api/v1/users/batch", json=duplicate, headers=headers)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert user_crud.get_user_by_email(test_db, "new@example.com") is None
+
+    update = [
+        {**{k: v for k, v in u.items() if k != "password"}, "id": c["id"]}
+        for u, c in zip(payload[:2], created)
+    ]
+    update[0]["last_name"] = "Renamed"
+    response = client.patch("/api/v1/users/batch", json=update, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert [u["last_name"] for u in response.json()] == ["Renamed", "1"]
+
+    activity = ActivityFactory(coach=coach)
+    response = client.post(
+        "/api/v1/users/batch/delete",
+        json={"ids": [coach.id] + [u["id"] for u in created]},
+        headers=headers,
+    )
+    assert response.json() == {"deleted": 6}
+    test_db.refresh(activity)
+    assert activity.coach_id is None
+
+
+def test_deleting_users_releases_their_bookings_and_classes(
+    client: TestClient, test_db: Session, auth_headers
+):
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    coach = UserFactory(roles=[RoleFactory(name="coach")])
+    leaving, waiting = UserFactory(), UserFactory()
+    headers = auth_headers(admin)
+    activity = ActivityFactory(
+        coach=coach, start_time=datetime.now() + timedelta(days=1), max_capacity=1
+    )
+    booking = booking_crud.book(test_db, activity.id, leaving.id)
+    promoted = booking_crud.book(test_db, activity.id, waiting.id)
+    activity_id, booking_id, promoted_id = activity.id, booking.id, promoted.id
+    assert promoted.booking_status == BookingStatus.WAITLIST
+
+    response = client.post(
+        "/api/v1/users/batch/delete",
+        json={"ids": [coach.id, leaving.id]},
+        headers=headers,
+    )
+    assert response.json() == {"deleted": 2}
+
+    # The deleted member's spot went to the waitlist
+    test_db.expire_all()
+    assert test_db.get(ActivityBooking, booking_id).booking_status == (
+        BookingStatus.CANCELLED
+    )
+    assert test_db.get(ActivityBooking, promoted_id).booking_status == (
+        BookingStatus.CONFIRMED
+    )
+
+    # Listings still work without the coach
+    response = client.get("/api/v1/activity/", params={"include": "attendees"})
+    assert response.status_code == status.HTTP_200_OK
+    (listed,) = response.json()["items"]
+    assert listed["id"] == activity_id
+    assert (listed["coach_id"], listed["coach_first_name"]) == (None, "")
+    assert (listed["attendee_count"], listed["waitlist_count"]) == (1, 0)
+    assert [a["id"] for a in listed["attendees"]] == [waiting.id]
+
+
+def test_user_directory_pages_sorts_and_filters(
+    client: TestClient, test_db: Session, auth_headers
+):
+    admin = UserFactory(roles=[RoleFactory(name="admin")], last_name="Admin")
+    coaches = [
+        UserFactory(roles=[RoleFactory(name="coach")], last_name=name)
+        for name in ("Baker", "Adams", "Clark")
+    ]
+    members = [
+        UserFactory(roles=[RoleFactory(name="client")], last_name=name)
+        for name in ("Adams", "Young", "Bell")
+    ]
+    test_db.commit()
+    headers = auth_headers(admin)
+
+    # Two pages of two, then the last one; ties on last_name are broken by id
+    seen, cursor = [], None
+    for _ in range(4):
+        params = {"limit": 2, "role": "client"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/v1/users/all", params=params, headers=headers).json()
+        seen.extend(user["id"] for user in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [m.id for m in sorted(members, key=lambda m: (m.last_name, m.id))]
+
+    response = client.get(
+        "/api/v1/users/all",
+        params={"role": "coach", "sort_by": "last_name", "order": "desc"},
+        headers=headers,
+    )
+    items = response.json()["items"]
+    assert [u["id"] for u in items] == [coaches[2].id, coaches[0].id, coaches[1].id]
+    assert all(u["roles"] == ["coach"] for u in items)
+
+    response = client.get(
+        "/api/v1/users/all",
+        params={"sort_by": "created_at", "limit": 7},
+        headers=headers,
+    )
+    page = response.json()
+    assert len(page["items"]) == 7 and page["next_cursor"] is None
+
+    # A cursor is only valid for the sort order it was issued for
+    first = client.get("/api/v1/users/all", params={"limit": 1}, headers=headers).json()
+    response = client.get(
+        "/api/v1/users/all",
+        params={"sort_by": "email", "cursor": first["next_cursor"]},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_user_directory_requires_admin(
+    client: TestClient, test_db: Session, auth_headers
+):
+    member = UserFactory()
+    response = client.get("/api/v1/users/all", headers=auth_headers(member))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_search_users(client: TestClient, test_db: Session, auth_headers):
+    admin = UserFactory(roles=[RoleFactory(name="admin")])
+    maria = UserFactory(first_name="Maria", last_name="Gonzalez", phone="14155550134")
+    mario = UserFactory(
+        first_name="Mario", last_name="Rossi", email="mrossi@example.com"
+    )
+    amar = UserFactory(first_name="Amar", last_name="Patel", phone="442071234567")
+    headers = auth_headers(admin)
+
+    def search(q: str) -> list:
+        response = client.get("/api/v1/users/search", params={"q": q}, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        return [user["id"] for user in response.json()]
+
+    # Prefix matches rank before other substring matches
+    assert search("mar") == [maria.id, mario.id, amar.id]
+    assert search("maria gonz") == [maria.id]
+    assert search("ROSSI@") == [mario.id]
+    # Phone lookups ignore punctuation and match the middle of the number
+    assert search("(415) 555") == [maria.id]
+    assert search("0134") == [maria.id]
+    # LIKE wildcards in the query are taken literally
+    assert search("m%a") == []
+
+    response = client.get("/api/v1/users/search", params={"q": "m"}, headers=headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
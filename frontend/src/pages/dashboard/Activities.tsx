@@ -15,20 +15,28 @@ export function Activities() {
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  const fetchPage = async (cursor: string | null) => {
+    const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await fetch(
+      `${API_BASE_URL}${API_ENDPOINTS.GET_ACTIVITIES}${params}`
+    );
+    if (!response.ok) {
+      throw new Error('Failed to fetch activities');
+    }
+    return response.json();
+  };
 
   const fetchActivities = async () => {
     // TODO: Remove this delay in production
     await new Promise((r) => setTimeout(r, 2000));
     setIsLoading(true);
     try {
-      const response = await fetch(
-        `${API_BASE_URL}${API_ENDPOINTS.GET_ACTIVITIES}`
-      );
-      if (!response.ok) {
-        throw new Error('Failed to fetch activities');
-      }
-      const data = await response.json();
-      setActivities(data as ActivityCardProps[]);
+      const data = await fetchPage(null);
+      setActivities(data.items as ActivityCardProps[]);
+      setNextCursor(data.next_cursor ?? null);
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An error occurred');
@@ -38,6 +46,25 @@ export function Activities() {
     }
   };
 
+  const fetchMoreActivities = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const data = await fetchPage(nextCursor);
+      setActivities((current) => [
+        ...current,
+        ...(data.items as ActivityCardProps[]),
+      ]);
+      setNextCursor(data.next_cursor ?? null);
+      setError(null);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'An error occurred');
+      console.error('Error fetching activities:', err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchActivities();
   }, []);
@@ -76,6 +103,18 @@ export function Activities() {
             ))}
       </div>
 
+      {!isLoading && nextCursor && (
+        <div className="flex justify-center pt-6">
+          <Button
+            variant="outline"
+            onClick={fetchMoreActivities}
+            disabled={isLoadingMore}
+          >
+            {isLoadingMore ? 'Loading...' : 'Load more classes'}
+          </Button>
+        </div>
+      )}
+
       {isModalOpen && (
         <div className="fixed inset-0 bg-black/50 flex items-center justify-center p-4 z-50">
           <div className="bg-background rounded-lg w-full max-w-4xl h-[90vh] overflow-auto p-6">
@@ -15,38 +15,48 @@ export function Clients() {
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  // Resolves to null when the user was sent back to the login page
+  const fetchPage = async (cursor: string | null) => {
+    const token = localStorage.getItem('auth_token');
+    if (!token) {
+      throw new Error('No authentication token found');
+    }
+
+    const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await fetch(
+      `${API_BASE_URL}${API_ENDPOINTS.GET_ALL_USERS}${params}`,
+      {
+        headers: {
+          Authorization: `Bearer ${token}`,
+          'Content-Type': 'application/json',
+        },
+      }
+    );
+
+    if (!response.ok) {
+      if (response.status === 401) {
+        // Handle unauthorized (token expired or invalid)
+        localStorage.removeItem('auth_token');
+        window.location.href = '/login';
+        return null;
+      }
+      throw new Error('Failed to fetch clients');
+    }
+    return response.json();
+  };
 
   const fetchClients = async () => {
     // TODO: Remove this delay in production
     setIsLoading(true);
     await new Promise((r) => setTimeout(r, 2000));
     try {
-      const token = localStorage.getItem('auth_token');
-      if (!token) {
-        throw new Error('No authentication token found');
-      }
-
-      const response = await fetch(
-        `${API_BASE_URL}${API_ENDPOINTS.GET_ALL_USERS}`,
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-            'Content-Type': 'application/json',
-          },
-        }
-      );
-
-      if (!response.ok) {
-        if (response.status === 401) {
-          // Handle unauthorized (token expired or invalid)
-          localStorage.removeItem('auth_token');
-          window.location.href = '/login';
-          return;
-        }
-        throw new Error('Failed to fetch clients');
-      }
-      const data = await response.json();
-      setClients(data as ClientCardProps[]);
+      const data = await fetchPage(null);
+      if (!data) return;
+      setClients(data.items as ClientCardProps[]);
+      setNextCursor(data.next_cursor ?? null);
       setError(null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An error occurred');
@@ -56,6 +66,26 @@ export function Clients() {
     }
   };
 
+  const fetchMoreClients = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const data = await fetchPage(nextCursor);
+      if (!data) return;
+      setClients((current) => [
+        ...current,
+        ...(data.items as ClientCardProps[]),
+      ]);
+      setNextCursor(data.next_cursor ?? null);
+      setError(null);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'An error occurred');
+      console.error('Error fetching clients:', err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchClients();
   }, []);
@@ -92,6 +122,18 @@ export function Clients() {
             clients.map((client) => <ClientCard key={client.id} {...client} />)}
       </div>
 
+      {!isLoading && nextCursor && (
+        <div className="flex justify-center pt-6">
+          <Button
+            variant="outline"
+            onClick={fetchMoreClients}
+            disabled={isLoadingMore}
+          >
+            {isLoadingMore ? 'Loading...' : 'Load more clients'}
+          </Button>
+        </div>
+      )}
+
       {isModalOpen && (
         <div className="fixed inset-0 bg-black/50 flex items-center justify-center p-4 z-50">
           <div className="bg-background rounded-lg w-full max-w-4xl h-[90vh] overflow-auto p-6">